@@ -1,5 +1,18 @@
+from .batcher import MicroBatcher
 from .database import LocationDatabase
+from .diff import NetworkChange, diff
 from .exceptions import IPAddressError, LocationIPFireDBReaderException, UnknownASNName
 from .ip_information import IpInformation
+from .network_record import NetworkRecord
 
-__all__ = ["IPAddressError", "IpInformation", "LocationDatabase", "LocationIPFireDBReaderException", "UnknownASNName"]
+__all__ = [
+    "IPAddressError",
+    "IpInformation",
+    "LocationDatabase",
+    "LocationIPFireDBReaderException",
+    "MicroBatcher",
+    "NetworkChange",
+    "NetworkRecord",
+    "UnknownASNName",
+    "diff",
+]
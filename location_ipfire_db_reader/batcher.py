@@ -0,0 +1,365 @@
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+import time
+import typing
+from concurrent.futures import Future
+from dataclasses import dataclass
+
+from .database_reader import _convert_ip_to_bitstring
+from .exceptions import IPAddressError
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Awaitable
+
+    from .database import LocationDatabase
+    from .ip_information import IpInformation
+
+
+__all__ = ["MicroBatcher", "MicroBatcherStatistics"]
+
+
+@dataclass(frozen=True)
+class MicroBatcherStatistics:
+    batches: int
+    requests: int
+    largest_batch: int
+    mean_batch_size: float
+    mean_delay: float  # Seconds between submitting a request and the start of its batch
+    max_delay: float
+
+
+class _Waiter:
+    """The part of a `Future` the worker uses, for callers blocking on the result right away.
+
+    Handing over a result through a bare lock is a lot cheaper than through a `Future` (and its condition variable).
+    It can't be cancelled, and `result()` can only be called once.
+    """
+
+    __slots__ = ("_exception", "_lock", "_result")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._lock.acquire()  # Released when the outcome is there
+        self._result: object = None
+        self._exception: BaseException | None = None
+
+    def set_running_or_notify_cancel(self) -> bool:
+        return True
+
+    def done(self) -> bool:
+        return not self._lock.locked()
+
+    def set_result(self, result: object) -> None:
+        self._result = result
+        self._lock.release()
+
+    def set_exception(self, exception: BaseException) -> None:
+        self._exception = exception
+        self._lock.release()
+
+    def result(self) -> object:
+        self._lock.acquire()
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+
+@dataclass(slots=True)  # Not frozen: one is created for every request, and that makes it a lot slower.
+class _Request:
+    ip: str
+    country_only: bool
+    future: Future | asyncio.Future | _Waiter
+    submitted: float  # time.monotonic()
+
+
+class MicroBatcher:
+    """Coalesce concurrent single lookups (from many threads or coroutines) into batched lookups.
+
+    A batch holds up to `max_batch_size` requests, or whatever arrived within `max_delay` seconds after the first one.
+    Identical requests in a batch are resolved once. Country lookups are answered by the `country_table` of the
+    database, the other lookups are sorted and resolved in one pass over the tree (see `LocationDatabase.lookup_many`).
+    The result (or the exception) is then handed to each caller.
+
+    Requests from threads (`find_country`, `lookup`) are resolved by the callers themselves: one of them resolves what
+    is queued, while the others queue theirs for the next batch. So with a `max_delay` of 0, a thread only waits for
+    others when they are busy anyway. Requests from `submit` (which doesn't wait) that nobody else picks up are
+    resolved by a worker thread. Requests from coroutines (`find_country_async`, `lookup_async`, `submit_async`) are
+    batched within their event loop: a batch holds everything submitted until the loop gets to run its next callback.
+    That avoids handing the GIL back and forth between the loop and a worker for every batch.
+
+    The worker and the event loops use `db` at the same time: reading from it is thread-safe.
+    """
+
+    def __init__(self, db: LocationDatabase, *, max_batch_size: int = 256, max_delay: float = 0.0) -> None:
+        if max_batch_size < 1 or max_delay < 0:
+            msg = f"Invalid limits: max_batch_size={max_batch_size} (at least 1), max_delay={max_delay} (at least 0)."
+            raise ValueError(msg)
+
+        self.db = db
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+
+        self._closed_lock = threading.Lock()  # No more requests get queued once the worker is told to stop.
+        self._leader = threading.Lock()  # Held by the thread resolving the queued requests
+        self._statistics_lock = threading.Lock()
+        self._queue: queue.SimpleQueue[_Request | None] = queue.SimpleQueue()
+        self._pending: dict[asyncio.AbstractEventLoop, list[_Request]] = {}  # Async requests, per loop
+        self._flushes: dict[asyncio.AbstractEventLoop, asyncio.Handle] = {}
+        self._closed = False
+
+        self._batches = 0
+        self._requests = 0
+        self._largest_batch = 0
+        self._total_delay = 0.0
+        self._max_delay = 0.0
+
+        self._worker = threading.Thread(target=self._run, name="MicroBatcher", daemon=True)
+        self._worker.start()
+
+    def _check_open(self) -> None:
+        if self._closed:
+            msg = "The batcher is closed."
+            raise RuntimeError(msg)
+
+    def _put(self, request: _Request) -> None:
+        with self._closed_lock:
+            self._check_open()
+            self._queue.put(request)
+
+    def submit(self, ip: str, *, country_only: bool = False) -> Future:
+        """Queue one lookup. The future resolves to an `IpInformation`, or the country code when `country_only`."""
+        future: Future = Future()
+        self._put(_Request(ip, country_only, future, time.monotonic()))
+        return future
+
+    def submit_async(self, ip: str, *, country_only: bool = False) -> asyncio.Future:
+        """Like `submit`, but from a coroutine: returns a future of the running event loop."""
+        self._check_open()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        pending = self._pending.get(loop)
+        if pending is None:  # The first request of a new batch
+            pending = self._pending[loop] = []
+            self._flushes[loop] = loop.call_later(self.max_delay, self._flush, loop)
+        pending.append(_Request(ip, country_only, future, time.monotonic()))
+        if len(pending) >= self.max_batch_size:
+            self._flush(loop)
+
+        return future
+
+    def lookup(self, ip: str) -> IpInformation:
+        return self._call(ip, country_only=False)
+
+    def find_country(self, ip: str) -> str:
+        return self._call(ip, country_only=True)
+
+    # Not coroutines themselves: awaiting the future directly saves a coroutine (and a task in `asyncio.gather`).
+    def lookup_async(self, ip: str) -> Awaitable[IpInformation]:
+        return self.submit_async(ip)
+
+    def find_country_async(self, ip: str) -> Awaitable[str]:
+        return self.submit_async(ip, country_only=True)
+
+    def _flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Resolve the pending requests of an event loop (running in that loop)."""
+        if (flush := self._flushes.pop(loop, None)) is not None:
+            flush.cancel()
+
+        batch = self._pending.pop(loop, [])
+        if batch:
+            self._handle(batch)
+
+    def _call(self, ip: str, *, country_only: bool) -> typing.Any:  # noqa: ANN401
+        """Resolve one request, for a caller waiting for the result."""
+        submitted = time.monotonic()
+        if not self._leader.acquire(blocking=False):
+            request = _Request(ip, country_only, _Waiter(), submitted)
+            self._put(request)
+            self._lead()
+            return request.future.result()
+
+        # Nobody else is resolving requests: this one starts the next batch right away.
+        request = None
+        try:
+            self._check_open()
+            if self.max_delay or not self._queue.empty():
+                request = _Request(ip, country_only, _Waiter(), submitted)
+                closed = self._resolve_queued(request)
+            else:  # A batch of just this request: no need to hand its result over
+                self._record([submitted])
+                outcome, failed = self._resolve({(ip, country_only)})[ip, country_only]
+                closed = False
+        finally:
+            self._leader.release()
+
+        if not closed:
+            self._lead()
+        if request is not None:
+            return request.future.result()
+        if failed:
+            raise outcome
+        return outcome
+
+    def _lead(self) -> None:
+        """Resolve the queued requests in the calling thread, unless another thread is already doing so.
+
+        A caller waiting for its own result might as well do the work: handing a result over from another thread
+        costs more than resolving it. The others queue their requests meanwhile, and get them in the next batch.
+        """
+        # Checking the queue after letting go closes the gap between a caller queuing its request (after the leader's
+        # last batch), and failing to take over (before the leader is done).
+        while not self._queue.empty() and self._leader.acquire(blocking=False):
+            try:
+                closed = self._resolve_queued()
+            finally:
+                self._leader.release()
+            if closed:
+                return
+
+    def _resolve_queued(self, first: _Request | None = None) -> bool:
+        """Resolve batches until the queue is empty. True when the worker has been told to stop."""
+        while True:
+            batch, closed = self._next_batch(first)
+            first = None
+            if batch:
+                self._handle_claimed(batch)
+            if closed or not batch:
+                return closed
+
+    def _next_batch(self, first: _Request | None) -> tuple[list[_Request], bool]:
+        """Take the next batch of requests from threads, and whether the worker has been told to stop."""
+        batch = [] if first is None else [first]
+        while len(batch) < self.max_batch_size:
+            # Take what is queued, and wait for more until the first request has waited `max_delay`.
+            remaining = batch[0].submitted + self.max_delay - time.monotonic() if batch else 0
+            if remaining <= 0 and self._queue.empty():
+                break
+            try:
+                request = self._queue.get(timeout=max(remaining, 0))
+            except queue.Empty:
+                break
+            if request is None:
+                self._queue.put(None)  # For the worker: stop after this batch
+                return batch, True
+            batch.append(request)
+
+        return batch, False
+
+    def _run(self) -> None:
+        """Resolve the requests queued by `submit` (which doesn't wait for them) and nobody else took on."""
+        while (first := self._queue.get()) is not None:
+            with self._leader:
+                if self._resolve_queued(first):
+                    break
+
+    def _handle_claimed(self, batch: list[_Request]) -> None:
+        # Claim the futures first: once running, they can't be cancelled while their result is being set.
+        batch = [request for request in batch if request.future.set_running_or_notify_cancel()]
+        try:
+            self._handle(batch)
+        except Exception as ex:  # Keep going, or all later callers would wait forever.
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(ex)
+
+    def _handle(self, batch: list[_Request]) -> None:
+        """Resolve a batch, and hand every result (or exception) to its future.
+
+        Runs in the thread resolving the queued requests (see `_handle_claimed`), or in the event loop the (asyncio)
+        futures belong to.
+        """
+        self._record([request.submitted for request in batch])
+        # An asyncio future can be cancelled while waiting. Identical requests are only resolved once.
+        keys = {(request.ip, request.country_only) for request in batch if not request.future.done()}
+        try:
+            outcomes = self._resolve(keys)
+        except Exception as ex:
+            outcomes = dict.fromkeys(keys, (ex, True))
+
+        for request in batch:
+            if request.future.done():
+                continue
+            outcome, failed = outcomes[request.ip, request.country_only]
+            if failed:
+                request.future.set_exception(outcome)
+            else:
+                request.future.set_result(outcome)
+
+    def _record(self, submitted: list[float]) -> None:
+        """Count a batch in the statistics, from the times its requests were submitted (oldest first)."""
+        if not submitted:
+            return  # All of them were cancelled
+
+        now = time.monotonic()
+        total_delay = len(submitted) * now - sum(submitted)
+
+        # Only held for these few updates: the threads and event loops don't hold each other up.
+        with self._statistics_lock:
+            self._batches += 1
+            self._requests += len(submitted)
+            self._largest_batch = max(self._largest_batch, len(submitted))
+            self._total_delay += total_delay
+            self._max_delay = max(self._max_delay, now - submitted[0])
+
+    def _resolve(self, keys: set[tuple[str, bool]]) -> dict[tuple[str, bool], tuple[object, bool]]:
+        """Resolve (ip, country_only) requests. Returns (result or exception, whether it failed) for each of them.
+
+        Country-only requests are answered by the `country_table` of the database, the others are looked up in one
+        sorted pass over the tree.
+        """
+        outcomes: dict[tuple[str, bool], tuple[object, bool]] = {}
+        in_order: list[tuple[str, str]] = []
+        find_country = None
+        for key in keys:
+            ip, country_only = key
+            try:
+                if country_only:
+                    find_country = find_country or self.db.country_table.find_country
+                    outcomes[key] = find_country(ip), False
+                else:
+                    in_order.append((_convert_ip_to_bitstring(ip), ip))
+            except (OSError, ValueError, IPAddressError) as ex:
+                outcomes[key] = ex, True
+
+        if not in_order:
+            return outcomes
+
+        in_order.sort()
+        matches = self.db._find_network_information_sorted(bits for bits, _ in in_order)
+        for (_, ip), match in zip(in_order, matches):
+            if match is None and self.db.raise_exceptions:
+                outcomes[ip, False] = IPAddressError(ip), True
+            else:
+                outcomes[ip, False] = self.db._ip_information(ip, match), False
+
+        return outcomes
+
+    def statistics(self) -> MicroBatcherStatistics:
+        with self._statistics_lock:
+            batches, requests = self._batches, self._requests
+            return MicroBatcherStatistics(
+                batches=batches,
+                requests=requests,
+                largest_batch=self._largest_batch,
+                mean_batch_size=requests / batches if batches else 0.0,
+                mean_delay=self._total_delay / requests if requests else 0.0,
+                max_delay=self._max_delay,
+            )
+
+    def close(self) -> None:
+        """Handle the requests that are still queued by threads, and stop the worker."""
+        with self._closed_lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(None)
+        self._worker.join()
+
+    def __enter__(self) -> MicroBatcher:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
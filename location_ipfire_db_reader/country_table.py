@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import copy
+import socket
+import typing
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+
+from .database_reader import _NO_NODE, _convert_ip_to_bitstring, _is_reserved
+from .exceptions import IPAddressError
+from .network_record import _ipv4_mapped_prefix
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from .database_reader import DatabaseReader
+
+
+__all__ = ["CountryTable", "CountryTableStatistics"]
+
+_MISS = 0  # Index in the country codes of the ranges without any network
+
+
+@dataclass(frozen=True)
+class CountryTableStatistics:
+    ipv4_ranges: int
+    ipv6_ranges: int
+    countries: int
+    memory: int  # Bytes used by the arrays of the table
+    tree_memory: int  # Bytes taken by the network tree and network data in the database
+
+
+class CountryTable:
+    """Country-only lookups from a sorted list of address ranges.
+
+    The network tree is flattened into consecutive ranges, each having one country code. Adjacent and nested
+    networks with the same country (that only differ in ASN or flags, for example) are merged into one range. A
+    lookup is then a binary search in compact parallel arrays: the range starts, and the index of their country.
+
+    IPv4 and IPv6 each have their own ranges. IPv6 starts are split in a high and a low 64-bit half.
+    """
+
+    def __init__(self, db: DatabaseReader) -> None:
+        self._db = db
+        self._codes: list[str | None] = [None]  # _MISS
+        self._code_indexes: dict[str | None, int] = {None: _MISS}
+
+        self._ipv4_starts = array("I")
+        self._ipv4_countries = array("H")
+        self._ipv6_starts_high = array("Q")
+        self._ipv6_starts_low = array("Q")
+        self._ipv6_countries = array("H")
+
+        self._build()
+
+    def _build(self) -> None:
+        tree = self._db._network_tree()
+
+        def country_of(node_index: int, fallback: int) -> int:
+            network = tree.leaf(node_index)
+            return fallback if network is None else self._code_index(network.country_code)
+
+        ipv4_root, covering = self._db._descend_to_network(_ipv4_mapped_prefix, 96)
+        ipv4_country = self._code_index(covering[0].country_code) if covering else _MISS
+        ipv4_ranges = self._flatten(tree.nodes, ipv4_root, 96, _ipv4_mapped_prefix, ipv4_country, country_of)
+        for start, country in ipv4_ranges:
+            self._ipv4_starts.append(start & 0xFFFFFFFF)
+            self._ipv4_countries.append(country)
+
+        # The IPv4 space has its own ranges: don't repeat them for IPv6.
+        ipv6_ranges = self._flatten(tree.nodes, 0, 0, 0, country_of(0, _MISS), country_of, skip=ipv4_root)
+        for start, country in ipv6_ranges:
+            self._ipv6_starts_high.append(start >> 64)
+            self._ipv6_starts_low.append(start & 0xFFFFFFFFFFFFFFFF)
+            self._ipv6_countries.append(country)
+
+    def _code_index(self, country_code: str) -> int:
+        if country_code not in self._code_indexes:
+            self._code_indexes[country_code] = len(self._codes)
+            self._codes.append(country_code)
+        return self._code_indexes[country_code]
+
+    @staticmethod
+    def _flatten(
+        tree: array,
+        node_index: int,
+        depth: int,
+        address: int,
+        country: int,
+        country_of: typing.Callable[[int, int], int],
+        skip: int | None = None,
+    ) -> list[tuple[int, int]]:
+        """Return the (start, country) of the merged ranges in the subtree of `node_index`, in address order.
+
+        A node index of `_NO_NODE` stands for a missing subtree: its whole range belongs to the country found so far.
+        """
+        ranges: list[tuple[int, int]] = []
+
+        def add(start: int, country: int) -> None:
+            if not ranges or ranges[-1][1] != country:
+                ranges.append((start, country))
+
+        # (node, depth, address, country so far)
+        stack = [(node_index, depth, address, country)]
+        while stack:
+            node_index, depth, address, country = stack.pop()
+            zero, one = (tree[node_index * 3], tree[node_index * 3 + 1]) if node_index != _NO_NODE else (0, 0)
+            if (not zero and not one) or node_index == skip:
+                add(address, country)
+                continue
+
+            half = 1 << (127 - depth)
+            # Push the one-branch first, so the zero-branch (lower addresses) is handled first.
+            for child, child_address in ((one, address | half), (zero, address)):
+                if child:
+                    stack.append((child, depth + 1, child_address, country_of(child, country)))
+                else:
+                    stack.append((_NO_NODE, depth + 1, child_address, country))
+
+        return ranges
+
+    @staticmethod
+    def _address(ip: str | int) -> int:
+        """The 128-bit address of an IP, accepting (and rejecting) the same input as a lookup in the tree does."""
+        if isinstance(ip, str):
+            ip = ip.split("/")[0]
+            try:
+                if ":" in ip:
+                    return int.from_bytes(socket.inet_pton(socket.AF_INET6, ip), "big")
+                return _ipv4_mapped_prefix | int.from_bytes(socket.inet_pton(socket.AF_INET, ip), "big")
+            except OSError:
+                pass  # A bitstring, or the same error the tree lookup raises
+
+        return int(_convert_ip_to_bitstring(ip), 2)
+
+    def _find(self, ip: str | int) -> str | None:
+        address = self._address(ip)
+        if _is_reserved(address):
+            return None
+
+        if address >> 32 == _ipv4_mapped_prefix >> 32:
+            return self._codes[self._ipv4_countries[bisect_right(self._ipv4_starts, address & 0xFFFFFFFF) - 1]]
+
+        high, low = address >> 64, address & 0xFFFFFFFFFFFFFFFF
+        first = bisect_left(self._ipv6_starts_high, high)
+        last = bisect_right(self._ipv6_starts_high, high, first)
+        position = bisect_right(self._ipv6_starts_low, low, first, last) - 1
+        return self._codes[self._ipv6_countries[position]]
+
+    def find_country(self, ip: str | int) -> str:
+        """Find the country code of 1 IP address, the same as `LocationDatabase.find_country` does."""
+        country_code = self._find(ip)
+        if country_code is None:
+            if self._db.raise_exceptions:
+                raise IPAddressError(ip)
+            return ""
+        return country_code
+
+    def find_countries(self, ips: Iterable[str | int]) -> list[str]:
+        return [self.find_country(ip) for ip in ips]
+
+    def _for_reader(self, db: DatabaseReader) -> CountryTable:
+        """This table for another reader of the same file: same ranges, but raising exceptions (or not) like `db`."""
+        table = copy.copy(self)
+        table._db = db
+        return table
+
+    def statistics(self) -> CountryTableStatistics:
+        arrays = (
+            self._ipv4_starts,
+            self._ipv4_countries,
+            self._ipv6_starts_high,
+            self._ipv6_starts_low,
+            self._ipv6_countries,
+        )
+        return CountryTableStatistics(
+            ipv4_ranges=len(self._ipv4_starts),
+            ipv6_ranges=len(self._ipv6_starts_high),
+            countries=len(self._codes) - 1,
+            memory=sum(len(arr) * arr.itemsize for arr in arrays),
+            tree_memory=self._db.header.network_tree_length + self._db.header.network_data_length,
+        )
@@ -1,26 +1,162 @@
 from __future__ import annotations
 
-from .database_reader import DatabaseReader
+import ipaddress
+import itertools
+import typing
+from collections import defaultdict
+from functools import cached_property
+
+from .country_table import CountryTable
+from .database_reader import (
+    _NO_NODE,
+    DatabaseReader,
+    _convert_ip_to_bitstring,
+    _is_reserved_network,
+    _shared_cached_property,
+)
 from .exceptions import IPAddressError
-from .interpret_location_db import loc_database_network_v1
-from .ip_information import IpInformation
+from .ip_information import _NO_NETWORK_INFORMATION, IpInformation
+from .network_record import NetworkRecord, _to_tree_address
+from .statistics import database_statistics
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from .database_reader import _NetworkMatch
 
 __all__ = ["LocationDatabase"]
 
+_aggregation_keys = ("country", "asn", "continent")
+_no_network_match = _NO_NETWORK_INFORMATION, 128
+
 
 class LocationDatabase(DatabaseReader):
     def __getitem__(self, ip: str) -> IpInformation:
         """Retrieve information about 1 IP address."""
-        try:
-            network_info, subnet_mask = self._find_network_information(ip)
-        except IPAddressError:
+        return self._ip_information(ip, self._match_network(_convert_ip_to_bitstring(ip)))
+
+    def _ip_information(self, ip: str, match: _NetworkMatch | None) -> IpInformation:
+        if match is None:
             if self.raise_exceptions:
-                raise
-            network_info = loc_database_network_v1(country_code="", _reserve=b"", asn=0, flags=0, _padding=b"")
-            subnet_mask = 128
+                raise IPAddressError(ip)
+            match = _no_network_match
+
+        return IpInformation(self, ip, *match)
+
+    @cached_property
+    def _continents(self) -> dict[str, str]:
+        return {country.code: country.continent_code for country in self.all_countries()}
+
+    def aggregate(
+        self, items: Iterable[tuple[str, float]], by: str = "country", chunk_size: int = 10_000
+    ) -> dict[str | int, float]:
+        """Sum the weights of (ip, weight) pairs per country code, ASN or continent code.
+
+        Countries and continents are found through the `country_table`. For ASNs, the input is consumed in chunks of
+        `chunk_size`, which are each sorted and looked up in one batch. Either way, only the totals per group are kept
+        in memory. Use a weight of 1 to count. Reserved IPs count for "" (or ASN 0) when the exceptions are turned off.
+        """
+        if by not in _aggregation_keys:
+            msg = f"Cannot aggregate by {by!r}, choose one of: {', '.join(_aggregation_keys)}."
+            raise ValueError(msg)
+
+        totals: dict[str | int, float] = defaultdict(int)
+        if by == "asn":
+            self._aggregate_asns(items, chunk_size, totals)
+        else:
+            table = self.country_table
+            for ip, weight in items:
+                country_code = table.find_country(ip)
+                totals[self._continents.get(country_code, "") if by == "continent" else country_code] += weight
+
+        return dict(totals)
+
+    def _aggregate_asns(self, items: Iterable[tuple[str, float]], chunk_size: int, totals: dict) -> None:
+        items = iter(items)
+        while chunk := list(itertools.islice(items, chunk_size)):
+            in_order = sorted((_convert_ip_to_bitstring(ip), ip, weight) for ip, weight in chunk)
+            matches = self._find_network_information_sorted(bits for bits, _, _ in in_order)
+            for (_, ip, weight), match in zip(in_order, matches):
+                if match is None and self.raise_exceptions:
+                    raise IPAddressError(ip)
+                totals[match[0].asn if match else 0] += weight
+
+    def lookup_sorted(self, ips: Iterable[str]) -> Iterator[IpInformation]:
+        """Retrieve information about many IP addresses, which should preferably be sorted.
+
+        Every lookup resumes from where its path in the tree diverges from the previous one, so the more prefix
+        consecutive addresses share, the less work is done.
+        """
+        ips, to_look_up = itertools.tee(ips)
+        matches = self._find_network_information_sorted(map(_convert_ip_to_bitstring, to_look_up))
+        for ip, match in zip(ips, matches):
+            yield self._ip_information(ip, match)
 
-        return IpInformation(self, ip, network_info, subnet_mask)
+    def lookup_many(self, ips: Iterable[str]) -> list[IpInformation]:
+        """Retrieve information about many IP addresses in any order: they're sorted, looked up, and put back."""
+        ips = list(ips)
+        in_order = sorted((_convert_ip_to_bitstring(ip), idx) for idx, ip in enumerate(ips))
+
+        results: list[IpInformation] = [None] * len(ips)
+        matches = self._find_network_information_sorted(bits for bits, _ in in_order)
+        for (_, idx), match in zip(in_order, matches):
+            results[idx] = self._ip_information(ips[idx], match)
+
+        return results
 
     def find_country(self, ip: str) -> str:
         """Convience method to quickly find the country code."""
         return self[ip].country_code
+
+    @_shared_cached_property
+    def _country_table(self) -> CountryTable:
+        return CountryTable(self)
+
+    @cached_property
+    def country_table(self) -> CountryTable:
+        """Country-only lookups from merged address ranges. Built with one pass over the tree on first use."""
+        return self._country_table._for_reader(self)
+
+    def find_countries(self, ips: Iterable[str]) -> list[str]:
+        """Find the country codes of many IP addresses at once, through the `country_table`."""
+        return self.country_table.find_countries(ips)
+
+    def query_network(self, cidr: str) -> Iterator[NetworkRecord]:
+        """Retrieve everything the database knows about a whole network at once.
+
+        The first record is the network covering `cidr` as a whole (if there is one), followed by all more specific
+        networks inside `cidr`, in address order. Catch-all entries without any information are left out.
+
+        Just like lookups of single IPs never match in reserved networks (like 10.0.0.0/8), networks lying completely
+        within a reserved network are left out too. A larger network only partly overlapping a reserved one is
+        returned, even though lookups of the reserved IPs in it don't match.
+        """
+        address, prefix_length = _to_tree_address(ipaddress.ip_network(cidr, strict=False))
+        if _is_reserved_network(address, prefix_length):
+            return
+
+        node_index, covering = self._descend_to_network(address, prefix_length)
+
+        if covering is not None:
+            network_info, covering_prefix_length = covering
+            covering_address = address >> (128 - covering_prefix_length) << (128 - covering_prefix_length)
+            yield NetworkRecord.from_tree(covering_address, covering_prefix_length, network_info)
+
+        if node_index != _NO_NODE:
+            for leaf_address, leaf_prefix_length, network_info in self._iterate_leaves(
+                node_index, prefix_length, address
+            ):
+                if not _is_reserved_network(leaf_address, leaf_prefix_length):
+                    yield NetworkRecord.from_tree(leaf_address, leaf_prefix_length, network_info)
+
+    @_shared_cached_property
+    def _statistics(self) -> dict:
+        return database_statistics(self)
+
+    def statistics(self) -> dict:
+        """Aggregate the address space per country, ASN, prefix length and flag, in one pass over the tree.
+
+        The result is cached on this reader (which stays on one version of the database), and every call returns that
+        same object: don't change it, or copy it first. See `statistics.database_statistics` for its layout.
+        """
+        return self._statistics
@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+import ipaddress
 import os
 import socket
+import sys
+import threading
 import typing
-from dataclasses import dataclass
+import weakref
+from array import array
+from bisect import bisect_right
+from dataclasses import MISSING, dataclass, field, fields
 from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import BinaryIO, TypeVar
 
-from .download_db import download_or_update_location_database
 from .exceptions import IPAddressError
 from .interpret_location_db import (
     Block,
@@ -21,16 +26,79 @@ from .interpret_location_db import (
     loc_database_network_v1,
     size,
 )
+from .multibit_trie import MultibitTrie
 
 if typing.TYPE_CHECKING:
-    from collections.abc import Iterator
+    from collections.abc import Callable, Iterable, Iterator
 
 
 __all__ = ["DatabaseReader", "is_ipv4"]
 
 T = TypeVar("T", bound=Block)
+R = TypeVar("R", bound="DatabaseReader")
 _ipv4_start: str = "0" * 80 + "1" * 16
+_ipv4_jump_bits: int = 16
+_ipv4_jump_depth: int = len(_ipv4_start) + _ipv4_jump_bits
+_engines: tuple[str, ...] = ("tree", "multibit")
+_scan_nodes_from_file: int = 1_024  # Subtrees with more nodes are enumerated from the in-memory network tree
 subnet_mask = int
+_NetworkMatch = tuple[loc_database_network_v1, subnet_mask]
+_TreeLeaf = tuple[int, subnet_mask, loc_database_network_v1]  # (128-bit address, prefix length, network)
+_JumpEntry = tuple[int, "_NetworkMatch | None"]  # (node index reached or 0, deepest leaf passed on the way)
+
+
+# Special-purpose networks that are never routed on the internet, so they are rejected before any tree traversal.
+# https://www.iana.org/assignments/iana-ipv4-special-registry & https://www.iana.org/assignments/iana-ipv6-special-registry
+_reserved_networks: tuple[str, ...] = (
+    "0.0.0.0/8",  # "This network"
+    "10.0.0.0/8",  # Private-use
+    "100.64.0.0/10",  # Shared address space (CGNAT)
+    "127.0.0.0/8",  # Loopback
+    "169.254.0.0/16",  # Link-local
+    "172.16.0.0/12",  # Private-use
+    "192.0.0.0/24",  # IETF protocol assignments
+    "192.0.2.0/24",  # Documentation (TEST-NET-1)
+    "192.168.0.0/16",  # Private-use
+    "198.18.0.0/15",  # Benchmarking
+    "198.51.100.0/24",  # Documentation (TEST-NET-2)
+    "203.0.113.0/24",  # Documentation (TEST-NET-3)
+    "224.0.0.0/4",  # Multicast
+    "240.0.0.0/4",  # Reserved, including the limited broadcast address
+    "::/128",  # Unspecified address
+    "::1/128",  # Loopback
+    "64:ff9b:1::/48",  # Local-use IPv4/IPv6 translation
+    "100::/64",  # Discard-only
+    "2001:db8::/32",  # Documentation
+    "fc00::/7",  # Unique-local
+    "fe80::/10",  # Link-local
+    "ff00::/8",  # Multicast
+)
+
+
+def _reserved_ranges() -> tuple[list[int], list[int]]:
+    """Sorted (first, last) 128-bit addresses of the reserved networks, IPv4 mapped into ::ffff:0:0/96."""
+    ranges = []
+    for network in map(ipaddress.ip_network, _reserved_networks):
+        first = int(network.network_address)
+        if network.version == 4:
+            first |= 0xFFFF << 32
+        ranges.append((first, first + network.num_addresses - 1))
+    ranges.sort()
+    return [first for first, _ in ranges], [last for _, last in ranges]
+
+
+_reserved_firsts, _reserved_lasts = _reserved_ranges()
+
+
+def _is_reserved(address: int) -> bool:
+    idx = bisect_right(_reserved_firsts, address) - 1
+    return idx >= 0 and address <= _reserved_lasts[idx]
+
+
+def _is_reserved_network(address: int, prefix_length: int) -> bool:
+    """Whether a whole network (as a 128-bit address and prefix length) lies within a reserved network."""
+    idx = bisect_right(_reserved_firsts, address) - 1
+    return idx >= 0 and address + (1 << (128 - prefix_length)) - 1 <= _reserved_lasts[idx]
 
 
 def is_ipv4(ip: str) -> bool:
@@ -60,34 +128,241 @@ def _convert_ip_to_bitstring(ip: str | int) -> str:
     return final
 
 
-@lru_cache(maxsize=5_000)
-def _read_network_from_file(fp: BinaryIO, offset: int) -> loc_database_network_node_v1:
-    fp.seek(offset, os.SEEK_SET)
-    return loc_database_network_node_v1.read(fp)
+def _common_prefix_length(bits: str, other_bits: str) -> int:
+    """How many leading bits both bitstrings have in common (at most the length of `bits`)."""
+    if not bits:
+        return 0
+    return len(bits) - (int(bits, 2) ^ int(other_bits[: len(bits)], 2)).bit_length()
+
+
+# The readers handed out by `DatabaseReader.open`, keyed by their class, resolved path and options.
+_shared_readers: dict[tuple, DatabaseReader] = {}
+# Their files, keyed by the resolved path: readers of the same file with other options share everything read from it.
+_shared_files: dict[Path, _SharedFile] = {}
+_shared_readers_lock = threading.Lock()
+
+# Reading at an offset doesn't move the file position, so threads can share one file handle without a lock.
+_has_pread: bool = hasattr(os, "pread")
+
+_NO_NETWORK: int = 0xFFFFFFFF  # The network index of tree nodes that aren't leaves
+_NO_NODE: int = -1  # Where a path through the tree ends before reaching the node looked for
+
+
+class _NetworkTree:
+    """The network tree and network data of a database in memory, for the features visiting (nearly) every node.
+
+    `nodes` holds a flat (zero, one, network) triplet per node. A child index of 0 means there's no such child.
+    """
+
+    def __init__(self, db: DatabaseReader) -> None:
+        header = db.header
+        self.nodes = array("I", db._read_section(header.network_tree_offset, header.network_tree_length))
+        if sys.byteorder == "little":
+            self.nodes.byteswap()  # The database is big endian
+        self.network_data = db._read_section(header.network_data_offset, header.network_data_length)
+
+    def __len__(self) -> int:
+        return len(self.nodes) // 3
+
+    def network_index(self, node_index: int) -> int:
+        return self.nodes[node_index * 3 + 2]
+
+    def leaf(self, node_index: int) -> loc_database_network_v1 | None:
+        """Like `DatabaseReader._read_leaf`: the network of a leaf, None for other nodes and catch-all entries."""
+        network_index = self.nodes[node_index * 3 + 2]
+        if network_index == _NO_NETWORK:
+            return None
+
+        network = loc_database_network_v1.unpack_from(self.network_data, network_index * size(loc_database_network_v1))
+        return None if network.is_catch_all else network
+
+
+@dataclass
+class _SharedFile:
+    """A database file and everything read or built from it, for all readers `DatabaseReader.open` returns for it.
+
+    A reader created directly has one of its own.
+    """
+
+    cache: dict[str, typing.Any] = field(default_factory=dict)  # The values of the `_shared_cached_property`s
+    references: int = 0  # Users of the readers from `open()`
+    closed: bool = False
+    fp_lock: threading.Lock = field(default_factory=threading.Lock)
+    network_tree: weakref.ref | None = None
+
+
+class _shared_cached_property(cached_property):
+    """A `cached_property` of the file, rather than of the reader: computed once for all readers sharing it.
+
+    Every reader still keeps the value in its own `__dict__` too, so using it is just as fast after the first time.
+    """
+
+    def __get__(self, instance: DatabaseReader | None, owner: type | None = None) -> typing.Any:  # noqa: ANN401
+        if instance is None:
+            return self
+
+        cache = instance._file.cache
+        if self.attrname not in cache:
+            cache[self.attrname] = self.func(instance)
+        value = instance.__dict__[self.attrname] = cache[self.attrname]
+        return value
 
 
 @dataclass
 class DatabaseReader:
     filename: str | Path
     raise_exceptions: bool = True
+    offline: bool = False  # Never check for updates: use the file as-is.
+    engine: str = "tree"  # "tree": walk the tree in the file, "multibit": build an in-memory multibit trie
+    multibit_stride: int = 4
+    _file: _SharedFile = field(default_factory=_SharedFile, init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         self.filename = Path(self.filename).resolve().absolute()
 
-    @cached_property
+        if self.engine not in _engines:
+            msg = f"Unknown lookup engine {self.engine!r}, choose one of: {', '.join(_engines)}."
+            raise ValueError(msg)
+
+    @classmethod
+    def open(cls: type[R], filename: str | Path, **options: typing.Any) -> R:  # noqa: ANN401
+        """Return a reader of this file shared by the whole process, taking the same options as the constructor.
+
+        The first call creates it. Later calls get the same instance, or for other options (like `raise_exceptions`) a
+        reader of their own that shares the file with it. Either way, the file is opened (and checked for updates,
+        unless the first caller passed `offline`) only once, and all caches and tables built by one user are there for
+        the next. Every call should be matched by a `close()` (or use it as a context manager): the file is closed when
+        the last user is done with it.
+        """
+        defaults = {item.name: item.default for item in fields(cls) if item.init and item.name != "filename"}
+        if unknown := options.keys() - defaults.keys():
+            msg = f"Unknown options: {', '.join(sorted(unknown))}. Choose from: {', '.join(defaults)}."
+            raise TypeError(msg)
+        options = {**{name: default for name, default in defaults.items() if default is not MISSING}, **options}
+
+        path = Path(filename).resolve().absolute()
+        key = (cls, path, *sorted(options.items()))
+        with _shared_readers_lock:
+            reader = _shared_readers.get(key)
+            if reader is None:
+                reader = cls(path, **options)
+                reader._file = _shared_files.setdefault(path, reader._file)
+                _shared_readers[key] = reader
+            reader._file.references += 1
+            return reader
+
+    def close(self) -> None:
+        """Close the file. The readers from `open()` are only closed when all of their users have closed them."""
+        shared = self._file
+        readers = [self]
+        with _shared_readers_lock:
+            if shared.references > 0:
+                shared.references -= 1
+                if shared.references > 0:
+                    return
+                for key, reader in list(_shared_readers.items()):
+                    if reader._file is shared:
+                        readers.append(_shared_readers.pop(key))
+                _shared_files.pop(self.filename, None)
+
+        with shared.fp_lock:
+            shared.closed = True
+            if "fp" in shared.cache:
+                shared.cache.pop("fp").close()
+            for reader in readers:
+                reader.__dict__.pop("fp", None)
+        if "_read_node" in shared.cache:
+            shared.cache["_read_node"].cache_clear()
+
+    def __enter__(self: R) -> R:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @_shared_cached_property
     def fp(self) -> BinaryIO:
-        download_or_update_location_database(self.filename)
-        return self.filename.open("rb")
+        with self._file.fp_lock:
+            if self._file.closed:
+                msg = f"The database {self.filename} is closed."
+                raise ValueError(msg)
+            if "fp" in self._file.cache:
+                return self._file.cache["fp"]  # Opened by another thread in the meantime
 
-    @cached_property
+            if not self.offline:
+                # Imported here so the download machinery (and `requests`) is only loaded when it's really needed.
+                from .download_db import download_or_update_location_database
+
+                download_or_update_location_database(self.filename)
+
+            fp = self._file.cache["fp"] = self.filename.open("rb")
+            return fp
+
+    @_shared_cached_property
     def header(self) -> loc_database_header_v1:
-        self.fp.seek(0, os.SEEK_SET)
+        fp = self.fp
+        with self._file.fp_lock:
+            fp.seek(0, os.SEEK_SET)
 
-        magic_header = loc_database_magic.read(self.fp)
-        assert magic_header.magic == b"LOCDBXX"
-        assert magic_header.version == 1
+            magic_header = loc_database_magic.read(fp)
+            assert magic_header.magic == b"LOCDBXX"
+            assert magic_header.version == 1
 
-        return loc_database_header_v1.read(self.fp)
+            return loc_database_header_v1.read(fp)
+
+    @cached_property
+    def sections(self) -> dict[str, tuple[int, int]]:
+        """The (offset, length) of every section in the database file."""
+        header = self.header
+        return {
+            "header": (0, size(loc_database_magic) + size(loc_database_header_v1)),
+            "as": (header.as_offset, header.as_length),
+            "network_data": (header.network_data_offset, header.network_data_length),
+            "network_tree": (header.network_tree_offset, header.network_tree_length),
+            "countries": (header.countries_offset, header.countries_length),
+            "pool": (header.pool_offset, header.pool_length),
+        }
+
+    def warm_up(
+        self, sections: Iterable[str] = ("network_tree", "network_data", "countries"), cold: Iterable[str] = ()
+    ) -> None:
+        """Get ready for the first lookups, typically right after starting up.
+
+        `sections` are prefetched into the page cache of the OS (in the background, where the OS supports it).
+        Warming up the network tree also reads its top levels and fills the IPv4 jump table (or builds the multibit
+        trie for that engine), so the first lookups don't pay for it.
+
+        `cold` sections are dropped from the page cache: in country-only deployments, the AS table ("as") and the
+        string pool ("pool") (only needed for `asn_name` and `country_name`) don't have to take up any memory.
+        """
+        sections, cold = tuple(sections), tuple(cold)
+        if unknown := set(sections + cold) - set(self.sections):
+            msg = f"Unknown sections: {', '.join(sorted(unknown))}. Choose from: {', '.join(self.sections)}."
+            raise ValueError(msg)
+
+        for name in sections:
+            offset, length = self.sections[name]
+            if not self._advise(offset, length, "POSIX_FADV_WILLNEED"):
+                # No way to give advice: read it once to get it into the page cache anyway.
+                for position in range(offset, offset + length, 1024 * 1024):
+                    self._read_section(position, min(1024 * 1024, offset + length - position))
+
+        for name in cold:
+            self._advise(*self.sections[name], "POSIX_FADV_DONTNEED")
+
+        if "network_tree" in sections:
+            if self.engine == "multibit":
+                _ = self._multibit_trie
+            else:
+                self._fill_ipv4_jump_table()
+
+    def _advise(self, offset: int, length: int, advice: str) -> bool:
+        """Tell the OS how a part of the file will be used. Returns False where that isn't supported."""
+        if not hasattr(os, "posix_fadvise") or not hasattr(os, advice):
+            return False
+
+        os.posix_fadvise(self.fp.fileno(), offset, length, getattr(os, advice))
+        return True
 
     def all_countries(self) -> Iterator[loc_database_country_v1]:
         yield from self._read_objects(
@@ -120,43 +395,300 @@ class DatabaseReader:
         )
 
     def _read_objects(self, type_: type[T], offset: int, length: int) -> Iterator[T]:
-        count = as_int(length / size(type_))
+        object_size = size(type_)
+        count = as_int(length / object_size)
+
+        # Read in chunks, so the file isn't left at some position in between (other users may read elsewhere).
+        for first in range(0, count, 1024):
+            chunk = self._read_section(offset + first * object_size, min(1024, count - first) * object_size)
+            for position in range(0, len(chunk), object_size):
+                yield type_.unpack_from(chunk, position)
+
+    @_shared_cached_property
+    def _read_node(self) -> Callable[[int], loc_database_network_node_v1]:
+        """`_read_node_from_file`, caching the nodes read most (the top of the tree)."""
+        return lru_cache(maxsize=5_000)(self._read_node_from_file)
+
+    def _read_node_from_file(self, node_index: int) -> loc_database_network_node_v1:
+        offset = self.header.network_tree_offset + size(loc_database_network_node_v1) * node_index
+        return loc_database_network_node_v1.unpack_from(self._read_section(offset, size(loc_database_network_node_v1)))
+
+    def _read_network(self, network_index: int) -> loc_database_network_v1:
+        network_offset = self.header.network_data_offset + network_index * size(loc_database_network_v1)
+        return loc_database_network_v1.unpack_from(self._read_section(network_offset, size(loc_database_network_v1)))
+
+    def _read_leaf(self, node: loc_database_network_node_v1) -> loc_database_network_v1 | None:
+        """Read the network data of a leaf, or None if it's not a leaf or a catch-all entry without useful data."""
+        if not node.is_leaf:
+            return None
+
+        network_data = self._read_network(node.network)
+
+        # Skip catch-all entries with no useful data; keep backtracking
+        # for a parent leaf that may have real information.
+        if network_data.is_catch_all:
+            return None
+
+        return network_data
+
+    def _read_section(self, offset: int, length: int) -> bytes:
+        """Read `length` bytes at `offset`. Safe to use from many threads at once."""
+        if _has_pread:
+            return os.pread(self.fp.fileno(), length, offset)
+
+        fp = self.fp
+        with self._file.fp_lock:
+            fp.seek(offset, os.SEEK_SET)
+            return fp.read(length)
+
+    def _network_tree(self) -> _NetworkTree:
+        """The network tree and network data in memory.
+
+        Everyone using it at the same time shares one copy, which is dropped when the last of them is done with it.
+        """
+        tree = self._file.network_tree() if self._file.network_tree is not None else None
+        if tree is None:
+            tree = _NetworkTree(self)
+            self._file.network_tree = weakref.ref(tree)
+        return tree
+
+    def _descend(self, bits: str, node_index: int, depth: int, fallback: _NetworkMatch | None) -> _JumpEntry:
+        """Follow `bits` down from `node_index` (at `depth`), remembering the deepest leaf passed on the way.
+
+        The node that is reached is *not* taken into account for the fallback: it will be (re-)visited by the walk
+        that resumes from there. If the path ends before all bits are consumed, the returned node index is 0.
+        """
+        for bit in bits:
+            node = self._read_node(node_index)
+            if (network_data := self._read_leaf(node)) is not None:
+                fallback = network_data, depth
 
-        self.fp.seek(offset, os.SEEK_SET)
+            node_index = node.zero if bit == "0" else node.one
+            depth += 1
+            if node_index == 0:
+                break
+
+        return node_index, fallback
+
+    @_shared_cached_property
+    def _ipv4_root(self) -> _JumpEntry:
+        """Where `::ffff:0:0/96` ends up in the tree, so IPv4 lookups don't have to walk those 96 bits each time."""
+        return self._descend(_ipv4_start, 0, 0, None)
+
+    @_shared_cached_property
+    def _ipv4_jump_table(self) -> list[_JumpEntry | None]:
+        """Direct-indexed by the first two octets of an IPv4 address. Slots are filled in on first use."""
+        return [None] * (1 << _ipv4_jump_bits)
+
+    def _fill_ipv4_jump_table(self) -> None:
+        """Fill in all slots of the IPv4 jump table at once, visiting every node above the jump depth only once."""
+        table = self._ipv4_jump_table
+        root, covering = self._ipv4_root
+
+        # (node, depth, the bits taken below ::ffff:0:0/96, deepest leaf above the node)
+        stack = [(root, len(_ipv4_start), 0, covering)]
+        while stack:
+            node_index, depth, prefix, fallback = stack.pop()
+            remaining = _ipv4_jump_depth - depth
+
+            if node_index == 0:  # The path ends here: all slots below resolve to the fallback.
+                first = prefix << remaining
+                table[first : first + (1 << remaining)] = [(0, fallback)] * (1 << remaining)
+                continue
 
-        for _ in range(count):
-            yield type_.read(self.fp)
+            if remaining == 0:
+                table[prefix] = node_index, fallback
+                continue
 
-    def _find_network_information(self, ip: str) -> tuple[loc_database_network_v1, subnet_mask]:
-        # Implementation from https://github.com/ipfire/libloc/blob/master/src/database.c#L848
-        node_index = 0
+            node = self._read_node(node_index)
+            if (network_data := self._read_leaf(node)) is not None:
+                fallback = network_data, depth
+            stack.append((node.zero, depth + 1, prefix << 1, fallback))
+            stack.append((node.one, depth + 1, (prefix << 1) | 1, fallback))
+
+    def _ipv4_jump(self, bits: str) -> _JumpEntry:
+        slot = int(bits[len(_ipv4_start) : _ipv4_jump_depth], 2)
+        entry = self._ipv4_jump_table[slot]
+        if entry is None:
+            node_index, fallback = self._ipv4_root
+            if node_index > 0:
+                entry = self._descend(bits[len(_ipv4_start) : _ipv4_jump_depth], node_index, len(_ipv4_start), fallback)
+            else:
+                entry = node_index, fallback
+            self._ipv4_jump_table[slot] = entry
+        return entry
+
+    def _descend_to_network(self, address: int, prefix_length: int) -> _JumpEntry:
+        """Find the node of a network in the tree, and the deepest leaf covering it (the node itself included).
 
+        The node index is `_NO_NODE` when the tree doesn't go as deep as the network.
+        """
+        bits = f"{address:0128b}"[:prefix_length]
+
+        if prefix_length >= _ipv4_jump_depth and bits.startswith(_ipv4_start):
+            node_index, fallback = self._ipv4_jump(bits)
+            if node_index > 0:
+                node_index, fallback = self._descend(bits[_ipv4_jump_depth:], node_index, _ipv4_jump_depth, fallback)
+        else:
+            node_index, fallback = self._descend(bits, 0, 0, None)
+
+        if node_index == 0 and bits:
+            return _NO_NODE, fallback  # The path ended above the network (without any bits, 0 is the root itself)
+
+        if (network_data := self._read_leaf(self._read_node(node_index))) is not None:
+            fallback = network_data, prefix_length
+
+        return node_index, fallback
+
+    def _iterate_leaves(self, node_index: int, depth: int, address: int) -> Iterator[_TreeLeaf]:
+        """Yield (address, prefix length, network) of all leaves with useful data below `node_index`, in address order.
+
+        The node itself is not included. The nodes are read from the file, bypassing the cache of `_read_node` (which
+        holds the top of the tree that every lookup needs). Past `_scan_nodes_from_file` nodes, the rest is visited
+        in the in-memory network tree instead.
+        """
+        tree: _NetworkTree | None = None
+        nodes_read = 0
+
+        def visit(node_index: int) -> tuple[int, int, loc_database_network_v1 | None]:
+            nonlocal tree, nodes_read
+            if tree is None and nodes_read < _scan_nodes_from_file:
+                nodes_read += 1
+                node = self._read_node_from_file(node_index)
+                return node.zero, node.one, self._read_leaf(node)
+
+            tree = tree or self._network_tree()
+            return tree.nodes[node_index * 3], tree.nodes[node_index * 3 + 1], tree.leaf(node_index)
+
+        stack: list[tuple[int, int, int]] = []
+
+        def push_children(zero: int, one: int, depth: int, address: int) -> None:
+            # The one-branch goes first, so the zero-branch (lower addresses) is popped first.
+            if one:
+                stack.append((one, depth + 1, address | (1 << (127 - depth))))
+            if zero:
+                stack.append((zero, depth + 1, address))
+
+        zero, one, _ = visit(node_index)
+        push_children(zero, one, depth, address)
+        while stack:
+            node_index, depth, address = stack.pop()
+            zero, one, network_data = visit(node_index)
+            if network_data is not None:
+                yield address, depth, network_data
+            push_children(zero, one, depth, address)
+
+    @cached_property
+    def _multibit_trie(self) -> MultibitTrie:
+        return MultibitTrie(self, self.multibit_stride)
+
+    def _walk_network_tree(self, bits: str, depth: int, node_index: int) -> _NetworkMatch | None:
+        # Implementation from https://github.com/ipfire/libloc/blob/master/src/database.c#L848
         node_chain = []
-        for bit in _convert_ip_to_bitstring(ip):
-            offset = self.header.network_tree_offset + size(loc_database_network_node_v1) * node_index
-            node = _read_network_from_file(self.fp, offset)
+        for bit in bits[depth:]:
+            node = self._read_node(node_index)
             node_chain.append(node)
 
             node_index = node.zero if bit == "0" else node.one
+            if node_index == 0:
+                break
+        else:
+            # Walked all the way down to a full-length network: that last node counts as well.
+            node_chain.append(self._read_node(node_index))
+
+        # Find the previous leaf here
+        while node_chain:
+            previous_node = node_chain.pop()
+            if (network_data := self._read_leaf(previous_node)) is not None:
+                return network_data, depth + len(node_chain)
+
+        return None
+
+    def _match_network(self, bits: str) -> _NetworkMatch | None:
+        """Find the network of an address (as a bitstring), None if there is none. Reserved addresses never match."""
+        if _is_reserved(int(bits, 2)):
+            return None
+        return self._engine_match(bits)
+
+    def _engine_match(self, bits: str) -> _NetworkMatch | None:
+        """Find the network of an address (as a bitstring) with the lookup engine, reserved or not."""
+        if self.engine == "multibit":
+            return self._multibit_trie.lookup(int(bits, 2))
+
+        if bits.startswith(_ipv4_start):
+            # Skip the ::ffff:0:0/96 prefix and the first two octets in one go.
+            node_index, fallback = self._ipv4_jump(bits)
+            match = self._walk_network_tree(bits, _ipv4_jump_depth, node_index) if node_index > 0 else None
+            return match or fallback
+
+        return self._walk_network_tree(bits, 0, 0)
+
+    def _find_network_information(self, ip: str) -> _NetworkMatch:
+        match = self._match_network(_convert_ip_to_bitstring(ip))
+        if match is None:
+            raise IPAddressError(ip)
 
-            if node_index > 0:
-                continue
+        return match
 
-            # Find the previous leaf here
-            while node_chain:
-                previous_node = node_chain.pop()
-                if not previous_node.is_leaf:
-                    continue
+    def _find_network_information_sorted(self, bitstrings: Iterable[str]) -> Iterator[_NetworkMatch | None]:
+        """Look up many addresses (as bitstrings), resuming every walk where its path diverges from the previous one.
 
-                network_offset = self.header.network_data_offset + previous_node.network * size(loc_database_network_v1)
-                self.fp.seek(network_offset, os.SEEK_SET)
-                network_data = loc_database_network_v1.read(self.fp)
+        Any order works, but sorted input pays off most: consecutive addresses share long prefixes. When the next
+        address follows the exact same path as the previous one, the previous result is returned immediately.
+        Misses are returned as None instead of raising an exception.
+        """
+        if self.engine == "multibit":
+            return map(self._match_network, bitstrings)
 
-                # Skip catch-all entries with no useful data; keep backtracking
-                # for a parent leaf that may have real information.
-                if not network_data.country_code and network_data.asn == 0 and network_data.flags == 0:
-                    continue
+        return self._resume_walks(bitstrings)
 
-                return network_data, len(node_chain)
+    def _resume_walks(self, bitstrings: Iterable[str]) -> Iterator[_NetworkMatch | None]:
+        walked = ""  # The bits the previous walk consumed, up to and including the one where its path ended.
+        base_depth = 0  # Depth of chain[0]
+        base_fallback: _NetworkMatch | None = None  # Deepest leaf above chain[0]
+        chain: list[loc_database_network_node_v1] = []  # The nodes on the previous path
+        matches: list[_NetworkMatch | None] = []  # matches[i]: the deepest leaf on the path up to chain[i]
+        match: _NetworkMatch | None = None
 
-            raise IPAddressError(ip)
+        for bits in bitstrings:
+            if _is_reserved(int(bits, 2)):
+                yield None
+                continue
+
+            if walked and bits.startswith(walked):
+                yield match  # Exact same path as the previous one
+                continue
+
+            common = _common_prefix_length(walked, bits)
+            if chain and base_depth <= common:
+                # Resume from the node where both paths diverge.
+                del chain[common - base_depth + 1 :], matches[common - base_depth + 1 :]
+                node = chain[-1]
+                node_index = node.zero if bits[common] == "0" else node.one
+                depth = common + 1
+            elif bits.startswith(_ipv4_start):
+                node_index, base_fallback = self._ipv4_jump(bits)
+                del chain[:], matches[:]
+                base_depth = depth = _ipv4_jump_depth
+            else:
+                node_index, base_fallback = 0, None
+                del chain[:], matches[:]
+                base_depth = depth = 0
+
+            # Walk down as far as the tree goes, keeping track of the deepest leaf on the way.
+            while node_index > 0 or depth == 0:
+                node = self._read_node(node_index)
+                chain.append(node)
+                if (network_data := self._read_leaf(node)) is not None:
+                    matches.append((network_data, depth))
+                else:
+                    matches.append(matches[-1] if matches else base_fallback)
+
+                if depth == len(bits):
+                    break
+                node_index = node.zero if bits[depth] == "0" else node.one
+                depth += 1
+
+            walked = bits[:depth]
+            match = matches[-1] if matches else base_fallback
+            yield match
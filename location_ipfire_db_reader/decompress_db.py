@@ -4,14 +4,20 @@ import lzma
 from pathlib import Path
 
 
-def decompress_xz_file(file_path: str | Path) -> None:
+def decompress_xz_file(file_path: str | Path, target: str | Path | None = None) -> None:
+    """Decompress `file_path` into `target` (by default: in place).
+
+    The target is replaced in one go, so readers that have the old file open keep reading the old contents.
+    """
     file_path = Path(file_path)
-    target = file_path.with_suffix(".tmp")
+    target = file_path if target is None else Path(target)
+    decompressed = target.with_name(target.name + ".tmp")
 
-    with lzma.open(file_path, "rb") as f_in, target.open("wb") as f_out:
+    with lzma.open(file_path, "rb") as f_in, decompressed.open("wb") as f_out:
         # Open the output file in binary mode and write the decompressed contents to it
         for chunk in iter(lambda: f_in.read(1024 * 1024), b""):
             f_out.write(chunk)
 
-    file_path.unlink()
-    target.rename(file_path)
+    if file_path != target:
+        file_path.unlink()
+    decompressed.replace(target)
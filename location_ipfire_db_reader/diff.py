@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import typing
+from array import array
+from dataclasses import dataclass
+
+from .database_reader import _NO_NODE
+from .network_record import NetworkRecord
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from .database_reader import DatabaseReader
+    from .interpret_location_db import loc_database_network_v1
+
+
+__all__ = ["NetworkChange", "diff"]
+
+
+@dataclass(frozen=True, slots=True)
+class NetworkChange:
+    """One network that differs between two versions of the database."""
+
+    network: str
+    old: NetworkRecord | None  # None: the network was added
+    new: NetworkRecord | None  # None: the network was removed
+
+    @property
+    def kind(self) -> str:
+        if self.old is None:
+            return "added"
+        if self.new is None:
+            return "removed"
+        return "changed"
+
+
+def _value(network: loc_database_network_v1 | None) -> tuple[str, int, int] | None:
+    """What a leaf says about its network: the country, ASN and flags."""
+    return None if network is None else (network.country_code, network.asn, network.flags)
+
+
+class _Snapshot:
+    """The network tree of one database loaded in memory, with a hash of every subtree."""
+
+    def __init__(self, db: DatabaseReader) -> None:
+        self.tree = db._network_tree()
+        self.hashes = self._hash_subtrees()
+
+    def leaf(self, node_index: int) -> loc_database_network_v1 | None:
+        """The network of a leaf, None for catch-all entries, non-leaves and missing nodes."""
+        return self.tree.leaf(node_index) if node_index != _NO_NODE else None
+
+    def child(self, node_index: int, bit: int) -> int:
+        if node_index == _NO_NODE:
+            return _NO_NODE
+        return self.tree.nodes[node_index * 3 + bit] or _NO_NODE
+
+    def _hash_subtrees(self) -> array:
+        tree = self.tree.nodes
+        hashes = array("q", bytes(len(self.tree) * 8))
+
+        # Hash the children before their parents: reverse pre-order.
+        pre_order = []
+        stack = [0]
+        while stack:
+            node_index = stack.pop()
+            pre_order.append(node_index)
+            stack.extend(child for child in (tree[node_index * 3], tree[node_index * 3 + 1]) if child)
+
+        for node_index in reversed(pre_order):
+            zero, one = tree[node_index * 3], tree[node_index * 3 + 1]
+            hashes[node_index] = hash(
+                (_value(self.leaf(node_index)), hashes[zero] if zero else 0, hashes[one] if one else 0)
+            )
+
+        return hashes
+
+
+def diff(old_db: DatabaseReader, new_db: DatabaseReader) -> Iterator[NetworkChange]:
+    """Yield every network that was added, removed or changed between two versions of the database.
+
+    Both trees are walked in lockstep, in address order. Subtrees that are identical in both versions (same networks
+    with the same country, ASN and flags) are skipped as a whole. Catch-all entries are treated as absent.
+    """
+    old, new = _Snapshot(old_db), _Snapshot(new_db)
+
+    # (node in the old tree, node in the new tree, depth, address)
+    stack = [(0, 0, 0, 0)]
+    while stack:
+        old_index, new_index, depth, address = stack.pop()
+
+        if old_index != _NO_NODE and new_index != _NO_NODE and old.hashes[old_index] == new.hashes[new_index]:
+            continue  # Nothing changed below here
+
+        old_leaf, new_leaf = old.leaf(old_index), new.leaf(new_index)
+        if _value(old_leaf) != _value(new_leaf):
+            old_record = NetworkRecord.from_tree(address, depth, old_leaf) if old_leaf is not None else None
+            new_record = NetworkRecord.from_tree(address, depth, new_leaf) if new_leaf is not None else None
+            yield NetworkChange((old_record or new_record).network, old_record, new_record)
+
+        # The one-branch goes first, so the zero-branch (lower addresses) is popped first.
+        for bit in (1, 0):
+            old_child, new_child = old.child(old_index, bit), new.child(new_index, bit)
+            if old_child != _NO_NODE or new_child != _NO_NODE:
+                stack.append((old_child, new_child, depth + 1, address | (bit << (127 - depth))))
@@ -32,7 +32,9 @@ def download_or_update_location_database(target_file: Path) -> None:
 
     if need_re_download:
         response = session.get(target_url)
-        target_file.write_bytes(response.content)
-        decompress_xz_file(target_file)
+        # Never write into `target_file` itself: it may be open (and in use) by a reader.
+        compressed = target_file.with_name(target_file.name + ".xz")
+        compressed.write_bytes(response.content)
+        decompress_xz_file(compressed, target_file)
 
     os.utime(target_file, (time.time(), time.time()))
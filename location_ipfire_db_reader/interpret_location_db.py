@@ -54,8 +54,11 @@ def as_int(nr: int | float | str) -> int:
 class Block:
     @classmethod
     def read(cls, fp: IO) -> Block:
-        n_bytes = fp.read(size(cls))
-        data = list(struct.unpack(fmt(cls), n_bytes))
+        return cls.unpack_from(fp.read(size(cls)))
+
+    @classmethod
+    def unpack_from(cls, buffer: bytes | memoryview, offset: int = 0) -> Block:
+        data = list(struct.unpack_from(fmt(cls), buffer, offset))
 
         # Convert bytes into string
         for idx, (field, value) in enumerate(zip(cls.__dataclass_fields__.values(), data)):  # type: tuple[int, tuple["Field", object]]
@@ -163,6 +166,11 @@ class loc_database_network_v1(Block):
     #  Reserved
     _padding: bytes = "2s"
 
+    @property
+    def is_catch_all(self) -> bool:
+        """Catch-all entries carry no useful data: a lookup should fall back to a parent network."""
+        return not self.country_code and self.asn == 0 and self.flags == 0
+
     @property
     def is_anonymous_proxy(self) -> bool:
         return bool(self.flags & LOC_NETWORK_FLAG_ANONYMOUS_PROXY)
@@ -2,10 +2,9 @@ from __future__ import annotations
 
 import functools
 import ipaddress
-import os
-from dataclasses import dataclass
+from dataclasses import FrozenInstanceError, dataclass
 from functools import cached_property
-from typing import BinaryIO, Callable, TypeVar
+from typing import Callable, TypeVar
 
 from .database_reader import DatabaseReader, is_ipv4
 from .exceptions import UnknownASNName
@@ -27,11 +26,34 @@ __all__ = ["IpInformation"]
 class _CannotFindObject(Exception): ...
 
 
+class _ReadOnlyNetwork(loc_database_network_v1):
+    """Network information that can't be changed, so it can safely be shared."""
+
+    def __init__(self, **fields: object) -> None:
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        msg = f"cannot assign to field {name!r}"
+        raise FrozenInstanceError(msg)
+
+    def __delattr__(self, name: str) -> None:
+        msg = f"cannot delete field {name!r}"
+        raise FrozenInstanceError(msg)
+
+
+# Shared by all lookups that didn't find anything (when exceptions are turned off).
+_NO_NETWORK_INFORMATION = _ReadOnlyNetwork(country_code="", _reserve=b"", asn=0, flags=0, _padding=b"")
+
+
 def return_empty_str_on_exception(func: Callable) -> Callable:
     """Switch easily between raising an exception and returning an empty string."""
 
     @functools.wraps(func)
     def inner(self, *args: object, **kwargs: object) -> object:
+        if self._network_info is _NO_NETWORK_INFORMATION:
+            return ""  # Nothing to look up: don't bother going through an exception.
+
         try:
             return func(self, *args, **kwargs)
         except:  # noqa: E722
@@ -141,15 +163,10 @@ class IpInformation:
     def ip_with_cidr(self) -> str:
         return f"{self.network_address}/{self.subnet_mask}"
 
-    @cached_property
-    def _fp(self) -> BinaryIO:
-        return self._db.fp
-
     def _read_string(self, position: int) -> str:
-        self._fp.seek(position, os.SEEK_SET)
         data: bytes = b""
         while (null_pos := data.find(b"\x00")) == -1:
-            data += self._fp.read(500)
+            data += self._db._read_section(position + len(data), 500)
         return data[:null_pos].decode("utf8")
 
     def _find_object(self, start_offset: int, max_size: int, obj_to_read: type[T], predicate: Callable[[T], int]) -> T:
@@ -160,8 +177,7 @@ class IpInformation:
 
         while lo <= hi:
             mid = (lo + hi) // 2
-            self._fp.seek(start_offset + mid * object_size)
-            obj = obj_to_read.read(self._fp)
+            obj = obj_to_read.unpack_from(self._db._read_section(start_offset + mid * object_size, object_size))
 
             pred = predicate(obj)
             if pred == 0:
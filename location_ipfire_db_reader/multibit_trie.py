@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import typing
+from array import array
+from dataclasses import dataclass
+
+from .interpret_location_db import loc_database_network_node_v1, size
+
+if typing.TYPE_CHECKING:
+    from .database_reader import DatabaseReader, _NetworkMatch
+
+
+__all__ = ["MultibitTrie", "MultibitTrieStatistics"]
+
+_ADDRESS_BITS = 128
+
+
+@dataclass(frozen=True)
+class MultibitTrieStatistics:
+    stride: int
+    nodes: int  # Multibit nodes, each holding 2**stride entries
+    nodes_per_level: tuple[int, ...]
+    max_depth: int  # Deepest level in use (the binary tree can be up to 128 levels deep)
+    networks: int  # Distinct (network, prefix length) results referenced by the entries
+    memory: int  # Bytes used by the arrays of the trie
+    tree_nodes: int  # Nodes in the binary tree of the database
+    tree_memory: int  # Bytes taken by the binary tree in the database
+
+
+class MultibitTrie:
+    """In-memory level-compressed version of the network tree.
+
+    The binary tree is cut into levels of `stride` bits, each level node being a direct-indexed table of
+    `2 ** stride` entries. Every entry holds the child node to continue with, and the deepest network (skipping
+    catch-all entries) on the path up to there: the leaves are pushed down, so the last entry visited in a lookup
+    is the answer. This is exactly what the backtracking in `DatabaseReader._walk_network_tree` finds, but in at
+    most `128 / stride` steps instead of up to 128.
+    """
+
+    def __init__(self, db: DatabaseReader, stride: int = 4) -> None:
+        if stride not in (1, 2, 4, 8, 16):
+            msg = f"The stride should divide 128 and be at most 16 bits, not {stride}."
+            raise ValueError(msg)
+
+        self._db = db
+        self.stride = stride
+        self._width = 1 << stride
+        self._mask = self._width - 1
+
+        # `2 ** stride` entries per level node. An entry is either the index of the level node to continue with,
+        # or -2 - the index into the networks below. -1 is used when nothing was found (at all).
+        # Entries with a child don't need a result of their own: the leaves are pushed down into the child.
+        self._entries = array("i")
+
+        # Parallel arrays, one per distinct result:
+        self._network_indexes = array("I")
+        self._prefix_lengths = array("B")
+
+        self._nodes_per_level: list[int] = []
+        self._tree_nodes = 0
+        self._build()
+
+    def _build(self) -> None:
+        self._tree = self._db._network_tree()
+        self._results: dict[tuple[int, int], int] = {}
+        self._tree_nodes = len(self._tree)
+
+        # (level node, binary node at the start of it, its level, deepest result so far)
+        pending = [(self._new_node(0), 0, 0, self._leaf(0, 0, -1))]
+        while pending:
+            pending.extend(self._expand(*pending.pop()))
+
+        # Only needed while building
+        del self._tree, self._results
+
+    def _leaf(self, node_index: int, depth: int, fallback: int) -> int:
+        """Return the result for `node_index` if it's a leaf with useful data, `fallback` otherwise."""
+        if self._tree.leaf(node_index) is None:
+            return fallback
+
+        network_index = self._tree.network_index(node_index)
+        key = network_index, depth
+        if key not in self._results:
+            self._results[key] = len(self._network_indexes)
+            self._network_indexes.append(network_index)
+            self._prefix_lengths.append(depth)
+        return self._results[key]
+
+    def _new_node(self, level: int) -> int:
+        empty_node = array("i", [-1]) * self._width
+        self._entries.extend(empty_node)
+
+        if level == len(self._nodes_per_level):
+            self._nodes_per_level.append(0)
+        self._nodes_per_level[level] += 1
+
+        return len(self._entries) // self._width - 1
+
+    def _expand(self, level_node: int, start_node: int, level: int, start_result: int) -> list[tuple[int, ...]]:
+        """Expand the `stride` levels of the binary tree below `start_node` into the entries of `level_node`.
+
+        Returns the level nodes that still need to be expanded on the next level.
+        """
+        tree = self._tree.nodes
+        base_depth = level * self.stride
+        base_entry = level_node << self.stride
+        next_level = []
+
+        # (binary node, depth relative to this level node, bits taken so far, deepest result so far)
+        stack = [(start_node, 0, 0, start_result)]
+        while stack:
+            node_index, relative_depth, prefix, result = stack.pop()
+
+            if relative_depth == self.stride:
+                entry = base_entry | prefix
+                if tree[node_index * 3] or tree[node_index * 3 + 1]:
+                    child = self._new_node(level + 1)
+                    self._entries[entry] = child
+                    next_level.append((child, node_index, level + 1, result))
+                else:
+                    self._entries[entry] = -2 - result
+                continue
+
+            for bit in (0, 1):
+                child_index = tree[node_index * 3 + bit]
+                child_prefix = (prefix << 1) | bit
+                if child_index:
+                    depth = base_depth + relative_depth + 1
+                    stack.append(
+                        (child_index, relative_depth + 1, child_prefix, self._leaf(child_index, depth, result))
+                    )
+                    continue
+
+                # The path ends here: every entry below this prefix resolves to what we have found so far.
+                span = self.stride - relative_depth - 1
+                first = base_entry | (child_prefix << span)
+                self._entries[first : first + (1 << span)] = array("i", [-2 - result]) * (1 << span)
+
+        return next_level
+
+    def lookup(self, address: int) -> _NetworkMatch | None:
+        """Find the network for a 128-bit address (IPv4 addresses mapped into ::ffff:0:0/96)."""
+        entries = self._entries
+        stride = self.stride
+        mask = self._mask
+
+        node = 0
+        shift = _ADDRESS_BITS
+        while node >= 0:
+            shift -= stride
+            node = entries[(node << stride) | ((address >> shift) & mask)]
+
+        result = -2 - node
+        if result < 0:
+            return None
+
+        return self._db._read_network(self._network_indexes[result]), self._prefix_lengths[result]
+
+    def statistics(self) -> MultibitTrieStatistics:
+        arrays = (self._entries, self._network_indexes, self._prefix_lengths)
+        return MultibitTrieStatistics(
+            stride=self.stride,
+            nodes=sum(self._nodes_per_level),
+            nodes_per_level=tuple(self._nodes_per_level),
+            max_depth=len(self._nodes_per_level),
+            networks=len(self._network_indexes),
+            memory=sum(len(arr) * arr.itemsize for arr in arrays),
+            tree_nodes=self._tree_nodes,
+            tree_memory=self._tree_nodes * size(loc_database_network_node_v1),
+        )
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import ipaddress
+from dataclasses import dataclass
+
+from .interpret_location_db import (
+    LOC_NETWORK_FLAG_ANONYMOUS_PROXY,
+    LOC_NETWORK_FLAG_ANYCAST,
+    LOC_NETWORK_FLAG_DROP,
+    LOC_NETWORK_FLAG_SATELLITE_PROVIDER,
+    loc_database_network_v1,
+)
+
+__all__ = ["NetworkRecord"]
+
+_ipv4_mapped_prefix = 0xFFFF << 32
+_ipv4_mapped_mask = ((1 << 96) - 1) << 32
+
+
+def _format_network(address: int, prefix_length: int) -> str:
+    """Format a 128-bit address + prefix length the way the tree stores it, IPv4 networks mapped in ::ffff:0:0/96."""
+    if prefix_length >= 96 and address & _ipv4_mapped_mask == _ipv4_mapped_prefix:
+        return f"{ipaddress.IPv4Address(address & 0xFFFFFFFF)}/{prefix_length - 96}"
+    return f"{ipaddress.IPv6Address(address)}/{prefix_length}"
+
+
+def _to_tree_address(network: ipaddress.IPv4Network | ipaddress.IPv6Network) -> tuple[int, int]:
+    """Return the 128-bit address and prefix length of `network` as they are found in the tree."""
+    if network.version == 4:
+        return _ipv4_mapped_prefix | int(network.network_address), network.prefixlen + 96
+    return int(network.network_address), network.prefixlen
+
+
+@dataclass(frozen=True, slots=True)
+class NetworkRecord:
+    """A compact view on one network in the database, without any lookups in the AS table or string pool."""
+
+    network: str
+    country_code: str
+    asn: int
+    flags: int
+
+    @classmethod
+    def from_tree(cls, address: int, prefix_length: int, network_info: loc_database_network_v1) -> NetworkRecord:
+        return cls(
+            _format_network(address, prefix_length), network_info.country_code, network_info.asn, network_info.flags
+        )
+
+    @property
+    def is_anonymous_proxy(self) -> bool:
+        return bool(self.flags & LOC_NETWORK_FLAG_ANONYMOUS_PROXY)
+
+    @property
+    def is_satellite_provider(self) -> bool:
+        return bool(self.flags & LOC_NETWORK_FLAG_SATELLITE_PROVIDER)
+
+    @property
+    def is_anycast(self) -> bool:
+        return bool(self.flags & LOC_NETWORK_FLAG_ANYCAST)
+
+    @property
+    def is_drop(self) -> bool:
+        return bool(self.flags & LOC_NETWORK_FLAG_DROP)
@@ -0,0 +1,314 @@
+"""A small lookup server, so many processes (in any language) can share one loaded database.
+
+The protocol is JSON lines over a Unix or (localhost) TCP socket. Every request is one line:
+
+    {"id": 1, "ips": ["8.8.8.8", "2001:4860::1"]}
+
+and gets exactly one line back, in the same order as the requests came in:
+
+    {"id": 1, "results": [{"ip": "8.8.8.8", "network": "8.8.8.0/24", "country_code": "US", "asn": 15169, "flags": 4},
+                          null]}
+
+`null` is returned for IPs without information, `{"id": ..., "error": "..."}` for invalid requests. Requests can be
+pipelined: there is no need to wait for an answer before sending the next request on the same connection.
+
+Run it with: `python -m location_ipfire_db_reader.server location.db --unix /run/location.sock` (or `--port 8765`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+import typing
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+from .database import LocationDatabase
+from .database_reader import _convert_ip_to_bitstring
+from .network_record import NetworkRecord
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+
+__all__ = ["LookupClient", "LookupServer", "LookupService"]
+
+Address = typing.Union[str, Path, tuple[str, int]]  # A Unix socket path, or (host, port)
+
+
+class LookupService:
+    """Answers lookup requests from one shared database, which is reloaded when the file is refreshed.
+
+    Checking for (and loading) a new version happens in the background: lookups carry on with the current database
+    in the meantime. A replaced database is closed once the lookups still using it are done.
+    """
+
+    def __init__(self, filename: str | Path, *, offline: bool = False, reload_interval: float = 60.0) -> None:
+        self.filename = Path(filename)
+        self.offline = offline
+        self.reload_interval = reload_interval
+
+        self._lock = threading.Lock()  # Only held to pick up, count or swap the database: never during I/O.
+        self._db = LocationDatabase(self.filename, raise_exceptions=False, offline=offline)
+        self._db_signature = self._signature()
+        self._users: Counter[int] = Counter()  # Lookups in progress, per id() of the database they're using
+        self._next_reload_check = time.monotonic() + reload_interval
+        self._reload_thread: threading.Thread | None = None
+
+    def _signature(self) -> tuple[int, int]:
+        stat = self._db.filename.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def _maybe_reload(self) -> None:
+        if time.monotonic() < self._next_reload_check:
+            return
+
+        with self._lock:
+            if time.monotonic() < self._next_reload_check:
+                return  # Another thread just started it
+            self._next_reload_check = float("inf")  # Until this reload is done
+
+            self._reload_thread = threading.Thread(target=self._reload, name="LookupService reload", daemon=True)
+            self._reload_thread.start()
+
+    def _reload(self) -> None:
+        try:
+            if not self.offline:
+                from .download_db import download_or_update_location_database
+
+                download_or_update_location_database(self._db.filename)
+
+            if (signature := self._signature()) != self._db_signature:
+                db = LocationDatabase(self.filename, raise_exceptions=False, offline=True)
+                if db.header.created_at != self._db.header.created_at:
+                    db = self._swap(db)
+                self._release(db)
+                self._db_signature = signature
+        finally:
+            self._next_reload_check = time.monotonic() + self.reload_interval
+
+    def _swap(self, db: LocationDatabase) -> LocationDatabase:
+        """Start using `db` for new lookups. Returns the database it replaces."""
+        with self._lock:
+            self._db, db = db, self._db
+        return db
+
+    @contextmanager
+    def _current_db(self) -> Iterator[LocationDatabase]:
+        with self._lock:
+            db = self._db
+            self._users[id(db)] += 1
+        try:
+            yield db
+        finally:
+            with self._lock:
+                self._users[id(db)] -= 1
+            self._release(db)
+
+    def _release(self, db: LocationDatabase) -> None:
+        """Close `db` if it has been replaced (or never was in use), and no lookup is using it anymore."""
+        with self._lock:
+            if db is self._db or self._users[id(db)] > 0:
+                return
+            del self._users[id(db)]
+        db.close()
+
+    def lookup(self, ips: list[str]) -> list[dict | None]:
+        in_order = sorted((_convert_ip_to_bitstring(ip), idx) for idx, ip in enumerate(ips))
+        results: list[dict | None] = [None] * len(ips)
+
+        self._maybe_reload()
+        with self._current_db() as db:
+            matches = db._find_network_information_sorted(bits for bits, _ in in_order)
+            for (bits, idx), match in zip(in_order, matches):
+                if match is None:
+                    continue
+
+                network_info, prefix_length = match
+                address = int(bits, 2) >> (128 - prefix_length) << (128 - prefix_length)
+                record = NetworkRecord.from_tree(address, prefix_length, network_info)
+                results[idx] = {
+                    "ip": ips[idx],
+                    "network": record.network,
+                    "country_code": record.country_code,
+                    "asn": record.asn,
+                    "flags": record.flags,
+                }
+
+        return results
+
+    def handle_line(self, line: bytes) -> bytes:
+        """Answer one request line with one response line."""
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            ips = request["ips"]
+            if not isinstance(ips, list) or not all(isinstance(ip, str) for ip in ips):
+                msg = "'ips' should be a list of strings"
+                raise TypeError(msg)  # noqa: TRY301
+            response = {"id": request_id, "results": self.lookup(ips)}
+        except (ValueError, KeyError, TypeError, AttributeError, OSError, struct.error) as ex:
+            response = {"id": request_id, "error": f"{type(ex).__name__}: {ex}"}
+
+        return json.dumps(response, separators=(",", ":")).encode() + b"\n"
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: _ThreadingUnixServer | _ThreadingTCPServer
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if line.strip():
+                self.wfile.write(self.server.service.handle_line(line))
+
+
+class _ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    service: LookupService
+
+
+class _ThreadingTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    service: LookupService
+
+
+class LookupServer:
+    """Serve lookups from `service` on a Unix socket (a path) or a TCP socket ((host, port), port 0 picks one)."""
+
+    def __init__(self, service: LookupService, address: Address) -> None:
+        if isinstance(address, tuple):
+            self._server = _ThreadingTCPServer(address, _RequestHandler)
+        else:
+            Path(address).unlink(missing_ok=True)  # Left behind by a previous run
+            self._server = _ThreadingUnixServer(str(address), _RequestHandler)
+        self._server.service = service
+
+    @property
+    def address(self) -> Address:
+        return self._server.server_address
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def shutdown(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if isinstance(self.address, str):
+            Path(self.address).unlink(missing_ok=True)
+
+    def __enter__(self) -> LookupServer:
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.shutdown()
+
+
+class LookupClient:
+    """Thread-safe client for a `LookupServer`, keeping a pool of up to `pool_size` connections."""
+
+    def __init__(self, address: Address, pool_size: int = 4, timeout: float | None = 30.0) -> None:
+        self.address = address if isinstance(address, tuple) else str(address)
+        self.timeout = timeout
+        self._pool: queue.LifoQueue[tuple[socket.socket, typing.BinaryIO]] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._request_ids = iter(range(1 << 62))
+
+    def _connect(self) -> tuple[socket.socket, typing.BinaryIO]:
+        family = socket.AF_INET if isinstance(self.address, tuple) else socket.AF_UNIX
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.address)
+        return sock, sock.makefile("rb")
+
+    @contextmanager
+    def _connection(self) -> Iterator[tuple[socket.socket, typing.BinaryIO]]:
+        with self._slots:
+            try:
+                connection = self._pool.get_nowait()
+            except queue.Empty:
+                connection = self._connect()
+
+            try:
+                yield connection
+            except BaseException:
+                connection[1].close()
+                connection[0].close()
+                raise
+            self._pool.put(connection)
+
+    def lookup_batches(self, batches: Iterable[list[str]]) -> list[list[dict | None]]:
+        """Send all batches pipelined over one connection, then collect all answers."""
+        requests = [{"id": next(self._request_ids), "ips": list(ips)} for ips in batches]
+
+        with self._connection() as (sock, reader):
+            sock.sendall(b"".join(json.dumps(request).encode() + b"\n" for request in requests))
+            responses = [json.loads(reader.readline()) for _ in requests]
+
+        results = []
+        for request, response in zip(requests, responses):
+            if "error" in response or response.get("id") != request["id"]:
+                msg = f"Lookup server failed: {response.get('error', response)}"
+                raise RuntimeError(msg)
+            results.append(response["results"])
+        return results
+
+    def lookup_many(self, ips: list[str]) -> list[dict | None]:
+        return self.lookup_batches([ips])[0]
+
+    def lookup(self, ip: str) -> dict | None:
+        return self.lookup_many([ip])[0]
+
+    def find_country(self, ip: str) -> str:
+        result = self.lookup(ip)
+        return result["country_code"] if result else ""
+
+    def close(self) -> None:
+        while True:
+            try:
+                sock, reader = self._pool.get_nowait()
+            except queue.Empty:
+                return
+            reader.close()
+            sock.close()
+
+    def __enter__(self) -> LookupClient:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve IP lookups from a location database.")
+    parser.add_argument("database", help="The location database file")
+    where = parser.add_mutually_exclusive_group(required=True)
+    where.add_argument("--unix", help="Listen on this Unix socket")
+    where.add_argument("--port", type=int, help="Listen on this TCP port")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface for --port (default: 127.0.0.1)")
+    parser.add_argument("--offline", action="store_true", help="Never download updates of the database")
+    parser.add_argument("--reload-interval", type=float, default=60.0, help="Seconds between checks for a new file")
+    args = parser.parse_args(argv)
+
+    service = LookupService(args.database, offline=args.offline, reload_interval=args.reload_interval)
+    server = LookupServer(service, args.unix or (args.host, args.port))
+    print(f"Serving lookups on {server.address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
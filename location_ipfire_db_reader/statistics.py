@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import typing
+from collections import defaultdict
+
+from .interpret_location_db import (
+    LOC_NETWORK_FLAG_ANONYMOUS_PROXY,
+    LOC_NETWORK_FLAG_ANYCAST,
+    LOC_NETWORK_FLAG_DROP,
+    LOC_NETWORK_FLAG_SATELLITE_PROVIDER,
+    loc_database_network_v1,
+)
+
+if typing.TYPE_CHECKING:
+    from .database_reader import DatabaseReader
+
+
+__all__ = ["database_statistics"]
+
+_IPV4_DEPTH = 96
+_IPV4_ADDRESS = 0xFFFF << 32  # ::ffff:0:0
+_FLAGS = {
+    "anonymous_proxy": LOC_NETWORK_FLAG_ANONYMOUS_PROXY,
+    "satellite_provider": LOC_NETWORK_FLAG_SATELLITE_PROVIDER,
+    "anycast": LOC_NETWORK_FLAG_ANYCAST,
+    "drop": LOC_NETWORK_FLAG_DROP,
+}
+
+
+def _new_family(max_prefix_length: int) -> dict:
+    return {
+        "addresses": 0,
+        "countries": defaultdict(int),
+        "asns": defaultdict(int),
+        "prefix_lengths": [0] * (max_prefix_length + 1),
+        "flags": {name: {"networks": 0, "addresses": 0} for name in _FLAGS},
+    }
+
+
+def _count_network(family: dict, network: loc_database_network_v1, prefix_length: int) -> None:
+    family["prefix_lengths"][prefix_length] += 1
+    for name, flag in _FLAGS.items():
+        if network.flags & flag:
+            family["flags"][name]["networks"] += 1
+
+
+def _count_addresses(family: dict, network: loc_database_network_v1, addresses: int) -> None:
+    family["addresses"] += addresses
+    family["countries"][network.country_code] += addresses
+    family["asns"][network.asn] += addresses
+    for name, flag in _FLAGS.items():
+        if network.flags & flag:
+            family["flags"][name]["addresses"] += addresses
+
+
+def database_statistics(db: DatabaseReader) -> dict:
+    """Aggregate the whole address space of the database, for IPv4 and IPv6 separately.
+
+    Every address is counted once, for the most specific network it belongs to (skipping catch-all entries, just like
+    a lookup does). Per family, the result holds:
+    - `addresses`: the number of addresses covered by any network
+    - `countries` / `asns`: the number of addresses per country code / AS number ("" / 0 when not known)
+    - `prefix_lengths`: the number of networks per prefix length (a list, indexed by the prefix length)
+    - `flags`: per flag, the number of networks having it, and the number of addresses in those networks
+
+    It only holds plain dicts, lists and numbers, so it can be serialized (to JSON, for example) as is.
+    """
+    tree = db._network_tree()
+    nodes = tree.nodes
+
+    families = {4: _new_family(32), 6: _new_family(128)}
+
+    # (node, depth, address, most specific network so far)
+    stack: list[tuple[int, int, int, loc_database_network_v1 | None]] = [(0, 0, 0, None)]
+    while stack:
+        node_index, depth, address, network = stack.pop()
+        zero, one = nodes[node_index * 3], nodes[node_index * 3 + 1]
+        family = families[4 if depth >= _IPV4_DEPTH and address >> 32 == _IPV4_ADDRESS >> 32 else 6]
+
+        if (leaf := tree.leaf(node_index)) is not None:
+            network = leaf
+            _count_network(family, network, depth - _IPV4_DEPTH if family is families[4] else depth)
+
+        # The addresses of this node which aren't handed down to a child, belong to the network found so far.
+        half = 1 << (127 - depth) if depth < 128 else 0
+        addresses = (1 << (128 - depth)) - half * ((zero != 0) + (one != 0))
+        if network is not None and addresses:
+            _count_addresses(family, network, addresses)
+
+        if zero:
+            stack.append((zero, depth + 1, address, network))
+        if one:
+            stack.append((one, depth + 1, address | half, network))
+
+    result = {"created_at": db.header.created_at}
+    for version, family in families.items():
+        family["countries"] = dict(family["countries"])
+        family["asns"] = dict(family["asns"])
+        result[f"ipv{version}"] = family
+    return result
@@ -0,0 +1,79 @@
+"""Compare many concurrent single lookups: direct calls, against the micro-batcher.
+
+Usage: python scripts/benchmark_batcher.py [--lookups 20000] [--threads 32] [--batch 256] [--delay-us 0]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import ipaddress
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from location_ipfire_db_reader import LocationDatabase, MicroBatcher
+
+DB_PATH = Path(__file__).parent.parent / "tests/resources/location.db"
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument("--lookups", type=int, default=20_000, help="Concurrent single lookups")
+parser.add_argument("--threads", type=int, default=32, help="Threads for the threaded run")
+parser.add_argument("--batch", type=int, default=256, help="Maximum batch size")
+parser.add_argument("--delay-us", type=float, default=0, help="Maximum time to wait for a batch to fill up")
+args = parser.parse_args()
+
+rnd = random.Random(42)
+ips = [str(ipaddress.IPv4Address(rnd.getrandbits(32))) for _ in range(args.lookups)]
+
+db = LocationDatabase(DB_PATH, raise_exceptions=False, offline=True)
+db.warm_up()
+_ = db.country_table  # Built once, on first use by the batcher
+
+
+async def find_country_async(ip: str) -> str:
+    return db.find_country(ip)
+
+
+async def find_country_batched(batcher: MicroBatcher, ip: str) -> str:
+    return await batcher.find_country_async(ip)
+
+
+def report(name: str, start: float, batcher: MicroBatcher | None = None) -> None:
+    line = f"{name:<28}: {(time.perf_counter() - start) / len(ips) * 1e6:6.1f} µs per lookup"
+    if batcher:
+        statistics = batcher.statistics()
+        line += f" (mean batch {statistics.mean_batch_size:.1f}, mean delay {statistics.mean_delay * 1e6:.0f} µs)"
+    print(line)
+
+
+with ThreadPoolExecutor(args.threads) as pool:
+    start = time.perf_counter()
+    expected = list(pool.map(db.find_country, ips))
+    report("threads, direct", start)
+
+    with MicroBatcher(db, max_batch_size=args.batch, max_delay=args.delay_us / 1e6) as batcher:
+        start = time.perf_counter()
+        assert list(pool.map(batcher.find_country, ips)) == expected
+        report("threads, batched", start, batcher)
+
+
+async def main() -> None:
+    start = time.perf_counter()
+    assert await asyncio.gather(*(find_country_async(ip) for ip in ips)) == expected
+    report("asyncio, direct", start)
+
+    with MicroBatcher(db, max_batch_size=args.batch, max_delay=args.delay_us / 1e6) as batcher:
+        start = time.perf_counter()
+        assert await asyncio.gather(*(batcher.find_country_async(ip) for ip in ips)) == expected
+        report("asyncio, batched", start, batcher)
+
+    # The same, but every lookup awaited from a coroutine of its own: as a server handling requests would.
+    with MicroBatcher(db, max_batch_size=args.batch, max_delay=args.delay_us / 1e6) as batcher:
+        start = time.perf_counter()
+        assert await asyncio.gather(*(find_country_batched(batcher, ip) for ip in ips)) == expected
+        report("asyncio, batched, coroutines", start, batcher)
+
+
+asyncio.run(main())
@@ -0,0 +1,45 @@
+"""Measure the cold start (import + first lookup) in a fresh interpreter, with and without offline mode."""
+
+from __future__ import annotations
+
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+DB_PATH = Path(__file__).parent.parent / "tests/resources/location.db"
+RUNS = 10
+
+SNIPPET = """
+import sys, time
+start = time.perf_counter()
+from location_ipfire_db_reader import LocationDatabase
+imported = time.perf_counter()
+db = LocationDatabase({path!r}, offline={offline})
+db.find_country("8.8.8.8")
+looked_up = time.perf_counter()
+print(imported - start, looked_up - imported, "requests" in sys.modules)
+"""
+
+
+def measure(offline: bool) -> tuple[list[float], list[float], bool]:  # noqa: FBT001
+    import_times, lookup_times = [], []
+    loaded_requests = False
+    for _ in range(RUNS):
+        code = SNIPPET.format(path=str(DB_PATH), offline=offline)
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        import_time, lookup_time, requests_loaded = output.split()
+        import_times.append(float(import_time))
+        lookup_times.append(float(lookup_time))
+        loaded_requests |= requests_loaded == "True"
+    return import_times, lookup_times, loaded_requests
+
+
+for offline in (False, True):
+    import_times, lookup_times, loaded_requests = measure(offline)
+    print(
+        f"offline={offline!s:<5}  "
+        f"import: {statistics.median(import_times) * 1000:7.2f} ms  "
+        f"first lookup: {statistics.median(lookup_times) * 1000:7.2f} ms  "
+        f"requests imported: {loaded_requests}"
+    )
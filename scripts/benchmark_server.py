@@ -0,0 +1,69 @@
+"""Load test the lookup server with a number of concurrent clients.
+
+Usage: python scripts/benchmark_server.py [--unix PATH | --port PORT] [--clients 8] [--batch 100] [--requests 1000]
+
+Without --unix/--port, a server on the test database is started in this process.
+"""
+
+from __future__ import annotations
+
+import argparse
+import ipaddress
+import random
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from location_ipfire_db_reader.server import LookupClient, LookupServer, LookupService
+
+DB_PATH = Path(__file__).parent.parent / "tests/resources/location.db"
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument("--unix", help="Unix socket of a running server")
+parser.add_argument("--port", type=int, help="TCP port of a running server on localhost")
+parser.add_argument("--clients", type=int, default=8, help="Concurrent client threads")
+parser.add_argument("--batch", type=int, default=100, help="IPs per request")
+parser.add_argument("--requests", type=int, default=1_000, help="Requests per client")
+parser.add_argument("--pipeline", type=int, default=1, help="Requests sent at once per round trip")
+args = parser.parse_args()
+
+rnd = random.Random(42)
+ips = [str(ipaddress.IPv4Address(rnd.getrandbits(32))) for _ in range(100_000)]
+
+
+def run(address: str | tuple[str, int]) -> None:
+    client = LookupClient(address, pool_size=args.clients)
+    latencies: list[float] = []
+
+    def worker() -> None:
+        for _ in range(args.requests // args.pipeline):
+            batches = [rnd.sample(ips, args.batch) for _ in range(args.pipeline)]
+            start = time.perf_counter()
+            client.lookup_batches(batches)
+            latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=worker) for _ in range(args.clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    client.close()
+
+    total_ips = len(latencies) * args.pipeline * args.batch
+    print(f"{len(latencies)} round trips, {total_ips} IPs in {elapsed:.2f} s: {total_ips / elapsed:,.0f} IPs/s")
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"latency per round trip: p50 {quantiles[49] * 1000:.2f} ms, p99 {quantiles[98] * 1000:.2f} ms")
+
+
+if args.unix or args.port:
+    run(args.unix or ("127.0.0.1", args.port))
+else:
+    with (
+        tempfile.TemporaryDirectory() as tmp_dir,
+        LookupServer(LookupService(DB_PATH, offline=True), str(Path(tmp_dir) / "lookup.sock")) as server,
+    ):
+        run(server.address)
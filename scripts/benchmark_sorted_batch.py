@@ -0,0 +1,45 @@
+"""Compare single lookups with the prefix-resuming batch lookups on a sorted sample of IPs.
+
+Usage: python scripts/benchmark_sorted_batch.py [number of IPs, default 1_000_000]
+"""
+
+from __future__ import annotations
+
+import ipaddress
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+from location_ipfire_db_reader import LocationDatabase
+
+DB_PATH = Path(__file__).parent.parent / "tests/resources/location.db"
+COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+db = LocationDatabase(DB_PATH, raise_exceptions=False, offline=True)
+
+# Something that looks like a log: addresses clustered in a limited number of busy networks.
+rnd = random.Random(42)
+busy_networks = [ipaddress.ip_network(record.network) for record in db.query_network("0.0.0.0/0")]
+busy_networks = rnd.sample(busy_networks, min(len(busy_networks), 5_000))
+ips = [str(network[rnd.randrange(network.num_addresses)]) for network in rnd.choices(busy_networks, k=COUNT)]
+ips.sort(key=lambda ip: int(ipaddress.ip_address(ip)))
+
+
+def timed(description: str, func: Callable[[], list[str]]) -> list[str]:
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{description:<32} {elapsed:8.2f} s  {elapsed / COUNT * 1e6:6.2f} us/ip")
+    return result
+
+
+single = timed("single lookups", lambda: [db[ip].country_code for ip in ips])
+batch = timed("lookup_sorted", lambda: [info.country_code for info in db.lookup_sorted(ips)])
+shuffled = ips[:]
+rnd.shuffle(shuffled)
+timed("single lookups (shuffled input)", lambda: [db[ip].country_code for ip in shuffled])
+timed("lookup_many (shuffled input)", lambda: [info.country_code for info in db.lookup_many(shuffled)])
+
+assert single == batch
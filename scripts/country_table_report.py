@@ -0,0 +1,34 @@
+"""Report the size of the coalesced country table, compared to the network tree it's built from."""
+
+from __future__ import annotations
+
+import random
+import socket
+import struct
+import time
+from pathlib import Path
+
+from location_ipfire_db_reader import LocationDatabase
+
+DB_PATH = Path(__file__).parent.parent / "tests/resources/location.db"
+
+db = LocationDatabase(DB_PATH, raise_exceptions=False, offline=True)
+
+start = time.perf_counter()
+stats = db.country_table.statistics()
+print(f"built in {time.perf_counter() - start:.2f} s")
+print(f"networks:      {db.header.network_data_length // 12:>12,}")
+print(f"tree nodes:    {db.header.network_tree_length // 12:>12,}")
+print(f"IPv4 ranges:   {stats.ipv4_ranges:>12,}")
+print(f"IPv6 ranges:   {stats.ipv6_ranges:>12,}")
+print(f"countries:     {stats.countries:>12,}")
+print(f"table memory:  {stats.memory:>12,} bytes")
+print(f"tree + data:   {stats.tree_memory:>12,} bytes ({stats.tree_memory / stats.memory:.1f}x)")
+
+rnd = random.Random(42)
+ips = [socket.inet_ntoa(struct.pack(">I", rnd.getrandbits(32))) for _ in range(100_000)]
+for description, find_country in (("tree", db.find_country), ("country table", db.country_table.find_country)):
+    start = time.perf_counter()
+    for ip in ips:
+        find_country(ip)
+    print(f"find_country via {description:<14} {(time.perf_counter() - start) / len(ips) * 1e6:6.2f} us/ip")
@@ -1,12 +1,11 @@
 from __future__ import annotations
 
 import ipaddress
-import os
 from dataclasses import dataclass
 from pathlib import Path
 
 from location_ipfire_db_reader import IpInformation, LocationDatabase
-from location_ipfire_db_reader.database_reader import _read_network_from_file, is_ipv4
+from location_ipfire_db_reader.database_reader import is_ipv4
 from location_ipfire_db_reader.interpret_location_db import loc_database_network_node_v1, loc_database_network_v1, size
 
 
@@ -26,8 +25,7 @@ def dump(current_node: loc_database_network_node_v1, current_string: str) -> Non
         mask = len(current_string)
 
     network_offset = loc_db.header.network_data_offset + current_node.network * size(loc_database_network_v1)
-    loc_db.fp.seek(network_offset, os.SEEK_SET)
-    nw = loc_database_network_v1.read(loc_db.fp)
+    nw = loc_database_network_v1.unpack_from(loc_db._read_section(network_offset, size(loc_database_network_v1)))
 
     info = IpInformation(loc_db, str(ip), nw, mask)
 
@@ -44,19 +42,19 @@ def recursive(current_node: loc_database_network_node_v1, current_string: str) -
 
     if current_node.one != 0:
         recursive(
-            _read_network_from_file(loc_db.fp, loc_db.header.network_tree_offset + size(loc_database_network_node_v1) * current_node.one),
+            loc_db._read_node(current_node.one),
             current_string + "1"
         )
 
     if current_node.zero != 0:
         recursive(
-            _read_network_from_file(loc_db.fp, loc_db.header.network_tree_offset + size(loc_database_network_node_v1) * current_node.zero),
+            loc_db._read_node(current_node.zero),
             current_string + "0"
         )
 
 
 recursive(
-    _read_network_from_file(loc_db.fp, loc_db.header.network_tree_offset),
+    loc_db._read_node(0),
     ""
 )
 
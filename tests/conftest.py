@@ -1,3 +1,6 @@
+import ipaddress
+import random
+from collections.abc import Callable
 from pathlib import Path
 
 import pytest
@@ -20,3 +23,26 @@ def locdb(locdb_path: Path) -> LocationDatabase:
 @pytest.fixture(scope="session")
 def locdb_noexc(locdb_path: Path) -> LocationDatabase:
     return LocationDatabase(locdb_path, raise_exceptions=False)
+
+
+_random_addresses: dict[str, Callable[[random.Random], str]] = {
+    "ipv4": lambda rnd: str(ipaddress.IPv4Address(rnd.getrandbits(32))),
+    # Most of the IPv6 space in use lives in 2000::/3
+    "ipv6": lambda rnd: str(ipaddress.IPv6Address((0b001 << 125) | rnd.getrandbits(125))),
+    "any_ipv6": lambda rnd: str(ipaddress.IPv6Address(rnd.getrandbits(128))),
+}
+
+
+@pytest.fixture(scope="session")
+def random_ips() -> Callable[..., list[str]]:
+    """`random_ips(count, *families)`: `count` random addresses per family ("ipv4" by default), interleaved.
+
+    Every call starts from the same seed, so the tests are reproducible.
+    """
+
+    def generate(count: int, *families: str) -> list[str]:
+        rnd = random.Random(42)
+        generators = [_random_addresses[family] for family in families or ("ipv4",)]
+        return [generate_ip(rnd) for _ in range(count) for generate_ip in generators]
+
+    return generate
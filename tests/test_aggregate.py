@@ -0,0 +1,40 @@
+import random
+from collections import Counter
+from collections.abc import Callable
+
+import pytest
+
+from location_ipfire_db_reader import IPAddressError, LocationDatabase
+
+
+@pytest.fixture(scope="module")
+def flows(random_ips: Callable[..., list[str]]) -> list[tuple[str, int]]:
+    rnd = random.Random(42)
+    ips = ["8.8.8.8", "1.1.1.1", "5.39.209.157", "201.148.95.249", "100.127.255.25", "2001:4860::1"]
+    ips += random_ips(300)
+    return [(rnd.choice(ips), rnd.randint(1, 1500)) for _ in range(1_000)]
+
+
+@pytest.mark.parametrize("by", ["country", "asn", "continent"])
+def test_same_as_single_lookups(locdb_noexc: LocationDatabase, flows: list[tuple[str, int]], by: str) -> None:
+    expected: Counter = Counter()
+    for ip, weight in flows:
+        info = locdb_noexc[ip]
+        key = {"country": info.country_code, "asn": info.asn, "continent": info.country_continent}[by]
+        expected[key] += weight
+
+    assert locdb_noexc.aggregate(iter(flows), by=by, chunk_size=64) == dict(expected)
+
+
+def test_count(locdb: LocationDatabase) -> None:
+    assert locdb.aggregate([("8.8.8.8", 1), ("8.8.8.9", 1), ("1.1.1.1", 1)], by="country") == {"US": 2, "AU": 1}
+
+
+def test_reserved_ip(locdb: LocationDatabase) -> None:
+    with pytest.raises(IPAddressError):
+        locdb.aggregate([("100.127.255.25", 1)])
+
+
+def test_unknown_key(locdb: LocationDatabase) -> None:
+    with pytest.raises(ValueError, match="Cannot aggregate by 'city'"):
+        locdb.aggregate([], by="city")
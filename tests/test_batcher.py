@@ -0,0 +1,104 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from location_ipfire_db_reader import IPAddressError, LocationDatabase, MicroBatcher
+
+
+@pytest.fixture
+def ips(random_ips: Callable[..., list[str]]) -> list[str]:
+    return [*random_ips(2_000), "8.8.8.8", "2001:4860::1"]
+
+
+def test_threads(locdb_path: Path, locdb_noexc: LocationDatabase, ips: list[str]) -> None:
+    expected = [locdb_noexc.find_country(ip) for ip in ips]
+
+    db = LocationDatabase(locdb_path, raise_exceptions=False)
+    with MicroBatcher(db, max_batch_size=64, max_delay=0.001) as batcher:
+        with ThreadPoolExecutor(16) as pool:
+            assert list(pool.map(batcher.find_country, ips)) == expected
+
+        assert batcher.lookup("8.8.8.8").asn == locdb_noexc["8.8.8.8"].asn
+        statistics = batcher.statistics()
+
+    assert statistics.requests == len(ips) + 1
+    assert 1 <= statistics.largest_batch <= 64
+    assert statistics.batches < statistics.requests
+    assert statistics.mean_batch_size == statistics.requests / statistics.batches
+    assert 0 <= statistics.mean_delay <= statistics.max_delay
+
+
+def test_asyncio(locdb_path: Path, locdb_noexc: LocationDatabase, ips: list[str]) -> None:
+    async def main(batcher: MicroBatcher) -> list[str]:
+        return await asyncio.gather(*(batcher.find_country_async(ip) for ip in ips))
+
+    with MicroBatcher(LocationDatabase(locdb_path, raise_exceptions=False), max_delay=0.001) as batcher:
+        assert asyncio.run(main(batcher)) == [locdb_noexc.find_country(ip) for ip in ips]
+        assert batcher.statistics().largest_batch > 1
+
+
+def test_identical_requests_are_resolved_once(locdb: LocationDatabase, mocker: MockerFixture) -> None:
+    find_country = mocker.spy(locdb.country_table, "find_country")
+    sorted_lookup = mocker.spy(locdb, "_find_network_information_sorted")
+
+    with MicroBatcher(locdb, max_delay=0.05) as batcher:
+        countries = [batcher.submit("8.8.8.8", country_only=True) for _ in range(3)]
+        lookups = [batcher.submit("8.8.8.8") for _ in range(3)]
+
+        assert [future.result() for future in countries] == ["US"] * 3
+        assert {future.result().asn for future in lookups} == {locdb["8.8.8.8"].asn}
+        assert batcher.statistics().requests == 6
+
+    # Country lookups are answered by the country table, without walking the tree.
+    find_country.assert_called_once_with("8.8.8.8")
+    sorted_lookup.assert_called_once()
+
+
+def test_errors_stay_with_their_request(locdb_path: Path) -> None:
+    with MicroBatcher(LocationDatabase(locdb_path), max_delay=0.01) as batcher:
+        good = batcher.submit("8.8.8.8", country_only=True)
+        reserved = batcher.submit("10.0.0.1", country_only=True)
+        invalid = batcher.submit("not an ip")
+
+        assert good.result() == "US"
+        with pytest.raises(IPAddressError):
+            reserved.result()
+        with pytest.raises(OSError):  # noqa: PT011
+            invalid.result()
+
+
+def test_cancelled_requests_are_skipped(locdb: LocationDatabase) -> None:
+    with MicroBatcher(locdb, max_delay=0.05) as batcher:
+        cancelled = batcher.submit("8.8.8.8", country_only=True)
+        assert cancelled.cancel()
+        assert batcher.find_country("8.8.8.8") == "US"  # The worker is still alive
+    assert cancelled.cancelled()
+
+
+def test_worker_survives_failures(locdb: LocationDatabase, mocker: MockerFixture) -> None:
+    with MicroBatcher(locdb) as batcher:
+        mocker.patch.object(batcher, "_record", side_effect=RuntimeError("boom"))
+        with pytest.raises(RuntimeError, match="boom"):
+            batcher.find_country("8.8.8.8")
+
+        mocker.stopall()
+        assert batcher.find_country("8.8.8.8") == "US"
+
+
+def test_closed(locdb: LocationDatabase) -> None:
+    batcher = MicroBatcher(locdb)
+    future = batcher.submit("8.8.8.8", country_only=True)
+    batcher.close()
+
+    assert future.result() == "US"
+    with pytest.raises(RuntimeError, match="closed"):
+        batcher.submit("8.8.8.8")
+
+
+def test_invalid_limits(locdb: LocationDatabase) -> None:
+    with pytest.raises(ValueError, match="Invalid limits"):
+        MicroBatcher(locdb, max_batch_size=0)
@@ -0,0 +1,62 @@
+import ipaddress
+from collections.abc import Callable
+
+import pytest
+from pytest_mock import MockerFixture
+
+from location_ipfire_db_reader import IPAddressError, LocationDatabase
+
+
+def test_same_as_find_country(locdb_noexc: LocationDatabase, random_ips: Callable[..., list[str]]) -> None:
+    ips = ["8.8.8.8", "5.39.209.157", "100.127.255.25", "0.0.0.0", "255.255.255.255", "::", "::1", "::ffff:8.8.8.8"]
+    ips += random_ips(2_000) + random_ips(1_000, "ipv6") + random_ips(200, "any_ipv6")
+    for record in list(locdb_noexc.query_network("0.0.0.0/0"))[::10]:
+        network = ipaddress.ip_network(record.network)
+        ips += [str(network.network_address), str(network.broadcast_address)]
+        if int(network.network_address) > 0:
+            ips.append(str(network.network_address - 1))
+
+    expected = []
+    for ip in ips:
+        try:
+            expected.append(locdb_noexc._find_network_information(ip)[0].country_code)
+        except IPAddressError:
+            expected.append("")
+
+    assert locdb_noexc.find_countries(ips) == expected
+
+
+def test_find_country(locdb: LocationDatabase) -> None:
+    assert locdb.country_table.find_country("8.8.8.8") == "US"
+    assert locdb.country_table.find_country("2001:4860::8888") == "US"
+
+    with pytest.raises(IPAddressError):
+        locdb.country_table.find_country("100.127.255.25")
+
+
+def test_statistics(locdb: LocationDatabase) -> None:
+    stats = locdb.country_table.statistics()
+
+    assert 0 < stats.ipv4_ranges < len(list(locdb.all_network_data())) * 2
+    assert stats.ipv6_ranges > 0
+    assert stats.countries > 0
+    assert stats.memory == stats.ipv4_ranges * 6 + stats.ipv6_ranges * 18
+
+
+@pytest.mark.parametrize("ip", ["8.8.2056", "8.8.8.8 junk", "134744072", "8.8.8", "not an ip"])
+def test_rejects_what_find_country_rejects(locdb: LocationDatabase, ip: str) -> None:
+    with pytest.raises(OSError):  # noqa: PT011
+        locdb.find_country(ip)
+    with pytest.raises(OSError):  # noqa: PT011
+        locdb.find_countries([ip])
+
+
+def test_same_input_as_find_country(locdb: LocationDatabase) -> None:
+    ips = [134744072, "8.8.8.8/24", "::ffff:8.8.8.8", "0" * 80 + "1" * 16 + f"{134744072:032b}"]
+    assert locdb.find_countries(ips) == [locdb.find_country(ip) for ip in ips] == ["US"] * len(ips)
+
+
+def test_aggregate_uses_the_table(locdb_noexc: LocationDatabase, mocker: MockerFixture) -> None:
+    walk = mocker.spy(locdb_noexc, "_find_network_information_sorted")
+    assert locdb_noexc.aggregate([("8.8.8.8", 1), ("10.0.0.1", 2)]) == {"US": 1, "": 2}
+    walk.assert_not_called()
@@ -1,3 +1,5 @@
+from collections.abc import Callable
+
 from location_ipfire_db_reader import LocationDatabase
 from location_ipfire_db_reader.database_reader import _convert_ip_to_bitstring
 
@@ -25,3 +27,22 @@ def test_all_network_data(locdb: LocationDatabase) -> None:
 
 def test_all_network_nodes(locdb: LocationDatabase) -> None:
     _ = next(locdb.all_network_nodes())  # Shouldn't fail
+
+
+def test_ipv4_jump_table_matches_full_walk(locdb: LocationDatabase, random_ips: Callable[..., list[str]]) -> None:
+    ips = ["8.8.8.8", "1.1.1.1", "5.39.209.157", "100.127.255.25", "0.0.0.0", "255.255.255.255"]
+    ips += random_ips(2_000)
+
+    # Compare the engines themselves: the reserved addresses would never get to the jump table.
+    for ip in ips:
+        bits = _convert_ip_to_bitstring(ip)
+        assert locdb._engine_match(bits) == locdb._walk_network_tree(bits, 0, 0), ip
+
+
+def test_network_tree_in_memory(locdb: LocationDatabase) -> None:
+    tree = locdb._network_tree()
+    assert locdb._network_tree() is tree  # Shared while in use
+
+    assert len(tree) == locdb.header.network_tree_length // 12
+    for node_index, node in enumerate(locdb.all_network_nodes()):
+        assert tree.leaf(node_index) == locdb._read_leaf(node)
@@ -0,0 +1,61 @@
+import ipaddress
+import shutil
+import struct
+from pathlib import Path
+
+import pytest
+
+from location_ipfire_db_reader import LocationDatabase, NetworkChange, NetworkRecord, diff
+from location_ipfire_db_reader.interpret_location_db import loc_database_network_node_v1, loc_database_network_v1, size
+from location_ipfire_db_reader.network_record import _to_tree_address
+
+
+@pytest.fixture
+def new_db_path(locdb_path: Path, tmp_path: Path) -> Path:
+    target = tmp_path / "location.db"
+    shutil.copy(locdb_path, target)
+    return target
+
+
+def _node_offset(db: LocationDatabase, cidr: str) -> int:
+    node_index, _ = db._descend_to_network(*_to_tree_address(ipaddress.ip_network(cidr)))
+    return db.header.network_tree_offset + node_index * size(loc_database_network_node_v1)
+
+
+def _patch(path: Path, offset: int, data: bytes) -> None:
+    with path.open("r+b") as fp:
+        fp.seek(offset)
+        fp.write(data)
+
+
+def test_no_changes(locdb: LocationDatabase, locdb_path: Path) -> None:
+    assert list(diff(locdb, LocationDatabase(locdb_path, offline=True))) == []
+
+
+def test_changed_country(locdb: LocationDatabase, new_db_path: Path) -> None:
+    node_offset = _node_offset(locdb, "8.8.8.0/24")
+    with new_db_path.open("rb") as fp:
+        fp.seek(node_offset)
+        network_index = loc_database_network_node_v1.read(fp).network
+    _patch(new_db_path, locdb.header.network_data_offset + network_index * size(loc_database_network_v1), b"XX")
+
+    changes = list(diff(locdb, LocationDatabase(new_db_path, offline=True)))
+
+    assert len(changes) == 1
+    assert changes[0].kind == "changed"
+    assert changes[0].old == NetworkRecord("8.8.8.0/24", "US", 15169, changes[0].old.flags)
+    assert changes[0].new == NetworkRecord("8.8.8.0/24", "XX", 15169, changes[0].old.flags)
+
+
+def test_removed_and_added_networks(locdb: LocationDatabase, new_db_path: Path) -> None:
+    # Turning the leaf into a plain node drops the network
+    _patch(new_db_path, _node_offset(locdb, "201.148.64.0/19") + 8, struct.pack(">I", 0xFFFFFFFF))
+    new_db = LocationDatabase(new_db_path, offline=True)
+
+    removed = list(diff(locdb, new_db))
+    assert removed == [NetworkChange("201.148.64.0/19", NetworkRecord("201.148.64.0/19", "MX", 18734, 0), None)]
+    assert removed[0].kind == "removed"
+
+    added = list(diff(new_db, locdb))
+    assert [change.kind for change in added] == ["added"]
+    assert added[0].new == removed[0].old
@@ -1,4 +1,6 @@
 import os
+import subprocess
+import sys
 import time
 from pathlib import Path
 
@@ -72,3 +74,16 @@ def test_fake_download_file_exists_but_no_newer_available(tmp_path: Path, fake_d
     download_or_update_location_database(tgt)
     fake_download_session.head.assert_called()
     fake_download_session.get.assert_not_called()
+
+
+def test_offline_never_checks_for_updates(locdb_path: Path, mocker: MockerFixture) -> None:
+    download_mock = mocker.patch("location_ipfire_db_reader.download_db.download_or_update_location_database")
+
+    _ = LocationDatabase(locdb_path, offline=True).header
+    download_mock.assert_not_called()
+
+
+def test_import_does_not_load_requests() -> None:
+    code = "import sys, location_ipfire_db_reader; print('requests' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
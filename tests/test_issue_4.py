@@ -3,11 +3,14 @@ https://github.com/svaningelgem/location_ipfire_db_reader/issues/4
 """
 
 import re
+from dataclasses import FrozenInstanceError
 
 import pytest
+from pytest_mock import MockerFixture
 
 from location_ipfire_db_reader import LocationDatabase
 from location_ipfire_db_reader.exceptions import IPAddressError, UnknownASNName
+from location_ipfire_db_reader.ip_information import _NO_NETWORK_INFORMATION
 
 
 def test_failure_cant_find_asn(locdb: LocationDatabase) -> None:
@@ -119,3 +122,24 @@ def test_lookup_for_reserved_ip_no_exceptions(locdb_noexc: LocationDatabase) ->
     assert not sut.is_satellite_provider
     assert not sut.is_anycast
     assert not sut.is_drop
+
+
+@pytest.mark.parametrize(
+    "ip",
+    ["10.1.2.3", "100.64.0.1", "127.0.0.1", "169.254.1.1", "172.16.5.4", "192.168.1.1", "224.0.0.1", "::1", "fd00::1"],
+)
+def test_reserved_ips_skip_the_tree(locdb_noexc: LocationDatabase, mocker: MockerFixture, ip: str) -> None:
+    walk = mocker.patch.object(locdb_noexc, "_walk_network_tree")
+    jump = mocker.patch.object(locdb_noexc, "_ipv4_jump")
+
+    sut = locdb_noexc[ip]
+
+    walk.assert_not_called()
+    jump.assert_not_called()
+    assert sut._network_info is _NO_NETWORK_INFORMATION
+    with pytest.raises(FrozenInstanceError):
+        sut._network_info.country_code = "US"  # It's shared by all misses
+    assert sut.country_code == ""
+    assert sut.country_name == ""
+    assert sut.asn_name == ""
+    assert locdb_noexc.country_table.find_country(ip) == ""
@@ -0,0 +1,65 @@
+import ipaddress
+import random
+from collections.abc import Callable
+
+import pytest
+
+from location_ipfire_db_reader import IPAddressError, LocationDatabase
+from location_ipfire_db_reader.database_reader import _convert_ip_to_bitstring
+
+
+def _sample_ips(locdb: LocationDatabase, random_ips: Callable[..., list[str]], count: int) -> list[str]:
+    """Random addresses, plus addresses in and right around known networks to have long shared prefixes."""
+    rnd = random.Random(42)
+    ips = ["8.8.8.8", "8.8.8.9", "5.39.209.157", "100.127.255.25", "::1"]
+    ips += random_ips(count, "ipv4", "ipv6")
+
+    networks = [ipaddress.ip_network(record.network) for record in locdb.query_network("0.0.0.0/0")]
+    networks += [ipaddress.ip_network(record.network) for record in locdb.query_network("2000::/3")]
+    for network in rnd.sample(networks, count):
+        ips.extend(str(network.network_address + offset) for offset in (0, network.num_addresses - 1))
+        ips.append(str(network[rnd.randrange(network.num_addresses)]))
+    return ips
+
+
+def _reference(locdb: LocationDatabase, ip: str) -> object:
+    try:
+        return locdb._find_network_information(ip)
+    except IPAddressError:
+        return None
+
+
+@pytest.mark.parametrize("is_sorted", [True, False])
+def test_same_results_as_single_lookups(
+    locdb: LocationDatabase,
+    random_ips: Callable[..., list[str]],
+    is_sorted: bool,  # noqa: FBT001
+) -> None:
+    ips = _sample_ips(locdb, random_ips, 500)
+    if is_sorted:
+        ips.sort(key=lambda ip: ipaddress.ip_address(ip).packed.rjust(16, b"\x00"))
+
+    bitstrings = map(_convert_ip_to_bitstring, ips)
+    assert list(locdb._find_network_information_sorted(bitstrings)) == [_reference(locdb, ip) for ip in ips]
+
+
+def test_lookup_many_keeps_the_order(locdb_noexc: LocationDatabase, random_ips: Callable[..., list[str]]) -> None:
+    ips = _sample_ips(locdb_noexc, random_ips, 200)
+
+    results = locdb_noexc.lookup_many(ips)
+
+    assert [result.ip for result in results] == ips
+    assert [result.ip_with_cidr for result in results] == [locdb_noexc[ip].ip_with_cidr for ip in ips]
+    assert [result.country_code for result in results] == [locdb_noexc.find_country(ip) for ip in ips]
+
+
+def test_lookup_sorted(locdb: LocationDatabase) -> None:
+    results = list(locdb.lookup_sorted(["8.8.8.8", "8.8.8.9", "201.148.95.249"]))
+
+    assert [result.country_code for result in results] == ["US", "US", "MX"]
+    assert results[2].ip_with_cidr == "201.148.64.0/19"
+
+
+def test_lookup_many_reserved_ip(locdb: LocationDatabase) -> None:
+    with pytest.raises(IPAddressError):
+        locdb.lookup_many(["8.8.8.8", "100.127.255.25"])
@@ -0,0 +1,53 @@
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from location_ipfire_db_reader import LocationDatabase
+from location_ipfire_db_reader.database_reader import _convert_ip_to_bitstring
+from location_ipfire_db_reader.multibit_trie import MultibitTrie
+
+
+@pytest.mark.parametrize("stride", [1, 4, 8])
+def test_same_results_as_tree_walk(
+    locdb: LocationDatabase, locdb_path: Path, random_ips: Callable[..., list[str]], stride: int
+) -> None:
+    sut = LocationDatabase(locdb_path, engine="multibit", multibit_stride=stride)
+
+    # Compare the trie itself: the reserved addresses (like ::1) would never get to it.
+    for ip in [
+        "8.8.8.8",
+        "5.39.209.157",
+        "100.127.255.25",
+        "2001:4860:4860::8888",
+        "::1",
+        *random_ips(1_000, "ipv4", "ipv6", "any_ipv6"),
+    ]:
+        bits = _convert_ip_to_bitstring(ip)
+        assert sut._multibit_trie.lookup(int(bits, 2)) == locdb._walk_network_tree(bits, 0, 0), ip
+
+
+def test_getitem(locdb_path: Path) -> None:
+    sut = LocationDatabase(locdb_path, engine="multibit")
+    assert sut.find_country("8.8.8.8") == "US"
+    assert sut["201.148.95.249"].ip_with_cidr == "201.148.64.0/19"
+
+
+def test_statistics(locdb: LocationDatabase) -> None:
+    stats = MultibitTrie(locdb, stride=8).statistics()
+
+    assert stats.stride == 8
+    assert stats.nodes == sum(stats.nodes_per_level)
+    assert stats.nodes_per_level[0] == 1
+    assert 1 < stats.max_depth <= 128 // 8
+    assert stats.networks > 0
+    assert stats.memory > 0
+    assert stats.tree_memory == stats.tree_nodes * 12
+
+
+def test_invalid_settings(locdb: LocationDatabase, locdb_path: Path) -> None:
+    with pytest.raises(ValueError, match="stride"):
+        MultibitTrie(locdb, stride=3)
+
+    with pytest.raises(ValueError, match="Unknown lookup engine"):
+        LocationDatabase(locdb_path, engine="btree")
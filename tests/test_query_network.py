@@ -0,0 +1,87 @@
+import ipaddress
+import random
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from location_ipfire_db_reader import IPAddressError, LocationDatabase, NetworkRecord
+from location_ipfire_db_reader.interpret_location_db import loc_database_network_v1
+from location_ipfire_db_reader.network_record import _to_tree_address
+
+
+def test_exact_network(locdb: LocationDatabase) -> None:
+    records = list(locdb.query_network("8.8.8.0/24"))
+
+    assert records[0] == NetworkRecord("8.8.8.0/24", "US", 15169, records[0].flags)
+    assert records[0].is_anycast
+
+
+def test_covering_network(locdb: LocationDatabase) -> None:
+    records = list(locdb.query_network("201.148.95.0/24"))
+    assert records == [NetworkRecord("201.148.64.0/19", "MX", 18734, 0)]
+
+
+def test_catch_all_entries_are_skipped(locdb: LocationDatabase) -> None:
+    networks = [record.network for record in locdb.query_network("5.39.0.0/16")]
+
+    assert "5.39.192.0/18" in networks
+    assert "5.39.209.0/24" not in networks
+
+
+def test_whole_address_space(locdb: LocationDatabase) -> None:
+    everything = set(locdb.query_network("::/0"))
+
+    assert set(locdb.query_network("0.0.0.0/0")) <= everything
+    assert set(locdb.query_network("2000::/3")) <= everything
+    assert len(everything) == len(list(locdb.query_network("::/1")))  # All networks live in the lower half
+
+
+def test_large_scans_leave_the_node_cache_alone(locdb_path: Path) -> None:
+    db = LocationDatabase(locdb_path)
+    assert list(db.query_network("0.0.0.0/0"))
+
+    assert db._read_node.cache_info().currsize <= 128  # Only the path down to the network
+
+
+def test_reserved_network(locdb: LocationDatabase) -> None:
+    assert list(locdb.query_network("100.64.0.0/10")) == []
+
+
+def test_reserved_networks_are_left_out(locdb_path: Path, mocker: MockerFixture) -> None:
+    """Like lookups, which never match there, even when the database has data for reserved networks."""
+    db = LocationDatabase(locdb_path)
+    network_info = loc_database_network_v1("US", b"", 15169, 0, b"")
+    covering = network_info, 96
+    mocker.patch.object(db, "_descend_to_network", return_value=(1, covering))
+    mocker.patch.object(
+        db,
+        "_iterate_leaves",
+        return_value=[
+            (*_to_tree_address(ipaddress.ip_network("10.0.0.0/8")), network_info),
+            (*_to_tree_address(ipaddress.ip_network("11.0.0.0/8")), network_info),
+        ],
+    )
+
+    assert list(db.query_network("10.1.0.0/16")) == []
+    assert [record.network for record in db.query_network("0.0.0.0/0")] == ["0.0.0.0/0", "11.0.0.0/8"]
+
+
+@pytest.mark.parametrize("cidr", ["0.0.0.0/0", "2000::/3", "::/0"])
+def test_consistent_with_lookups(locdb: LocationDatabase, cidr: str) -> None:
+    network = ipaddress.ip_network(cidr)
+    records = list(locdb.query_network(cidr))
+    networks = {record.network for record in records}
+
+    assert len(networks) == len(records)
+    in_order = [ipaddress.ip_network(record.network) for record in records]
+    assert in_order == sorted(in_order, key=_to_tree_address)  # IPv4 lives in ::ffff:0:0/96
+
+    rnd = random.Random(42)
+    for _ in range(500):
+        ip = str(network[rnd.getrandbits(network.max_prefixlen - network.prefixlen)])
+        try:
+            found = locdb[ip].ip_with_cidr
+        except IPAddressError:
+            continue
+        assert found in networks, ip
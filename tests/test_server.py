@@ -0,0 +1,147 @@
+import json
+import lzma
+import os
+import shutil
+import socket
+import struct
+import threading
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from location_ipfire_db_reader import LocationDatabase
+from location_ipfire_db_reader.interpret_location_db import loc_database_network_v1, size
+from location_ipfire_db_reader.server import LookupClient, LookupServer, LookupService
+
+
+@pytest.fixture(scope="module")
+def service(locdb_path: Path) -> LookupService:
+    return LookupService(locdb_path, offline=True)
+
+
+@pytest.fixture(params=["unix", "tcp"])
+def server(request: pytest.FixtureRequest, service: LookupService, tmp_path: Path) -> Iterator[LookupServer]:
+    address = str(tmp_path / "lookup.sock") if request.param == "unix" else ("127.0.0.1", 0)
+    with LookupServer(service, address) as server:
+        yield server
+
+
+def test_lookup(server: LookupServer, locdb: LocationDatabase) -> None:
+    with LookupClient(server.address) as client:
+        assert client.find_country("8.8.8.8") == "US"
+        assert client.lookup("100.127.255.25") is None
+        assert client.lookup("201.148.95.249") == {
+            "ip": "201.148.95.249",
+            "network": "201.148.64.0/19",
+            "country_code": "MX",
+            "asn": 18734,
+            "flags": 0,
+        }
+
+        ips = ["8.8.8.8", "1.1.1.1", "100.127.255.25", "5.39.209.157", "2001:4860::1"]
+        results = client.lookup_many(ips)
+        assert [result and result["country_code"] for result in results] == ["US", "AU", None, "ES", "US"]
+        assert results[3]["network"] == locdb["5.39.209.157"].ip_with_cidr
+
+
+def test_pipelined_batches(server: LookupServer) -> None:
+    with LookupClient(server.address, pool_size=1) as client:
+        results = client.lookup_batches([["8.8.8.8"], ["1.1.1.1", "8.8.8.8"], []])
+    assert [[result["country_code"] for result in batch] for batch in results] == [["US"], ["AU", "US"], []]
+
+
+def test_invalid_request(server: LookupServer) -> None:
+    family = socket.AF_INET if isinstance(server.address, tuple) else socket.AF_UNIX
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.connect(server.address)
+        sock.sendall(b'{"id": 7, "ips": "8.8.8.8"}\nnot json\n')
+        reader = sock.makefile("rb")
+        first, second = json.loads(reader.readline()), json.loads(reader.readline())
+
+    assert first["id"] == 7
+    assert "error" in first
+    assert "error" in second
+
+
+def _new_version(db_path: Path) -> bytes:
+    """The database at `db_path`, as a newer version in which 8.8.8.0/24 moved to "XX"."""
+    with LocationDatabase(db_path, offline=True) as db:
+        network, _ = db._find_network_information("8.8.8.8")
+        data = bytearray(db_path.read_bytes())
+        data[8:16] = struct.pack(">Q", db.header.created_at + 1)
+        network_index = next(i for i, nw in enumerate(db.all_network_data()) if nw == network)
+        offset = db.header.network_data_offset + network_index * size(loc_database_network_v1)
+        data[offset : offset + 2] = b"XX"
+    return bytes(data)
+
+
+def test_reload_on_refresh(locdb_path: Path, tmp_path: Path) -> None:
+    db_path = tmp_path / "location.db"
+    shutil.copy(locdb_path, db_path)
+    service = LookupService(db_path, offline=True, reload_interval=0)
+    assert service.lookup(["8.8.8.8"])[0]["country_code"] == "US"
+
+    # A new version of the database is put in place
+    new_path = tmp_path / "location.db.new"
+    new_path.write_bytes(_new_version(db_path))
+    os.utime(new_path, ns=(0, db_path.stat().st_mtime_ns + 1_000_000))
+    new_path.replace(db_path)
+
+    old_db = service._db
+    assert service.lookup(["8.8.8.8"])[0]["country_code"] == "US"  # Served while the reload runs in the background
+    service._reload_thread.join()
+    assert service.lookup(["8.8.8.8"])[0]["country_code"] == "XX"
+    assert "fp" not in old_db.__dict__  # Closed once it was replaced
+
+
+def test_lookups_go_on_during_an_update_check(locdb_path: Path, mocker: MockerFixture) -> None:
+    checking = threading.Event()
+    done = threading.Event()
+
+    def slow_update_check(_: Path) -> None:
+        checking.set()
+        assert done.wait(10)
+
+    service = LookupService(locdb_path, offline=True, reload_interval=0)
+    service.offline = False  # From now on, check for updates
+    mocker.patch("location_ipfire_db_reader.download_db.download_or_update_location_database", slow_update_check)
+
+    service.lookup(["8.8.8.8"])
+    assert checking.wait(10)
+    assert service.lookup(["8.8.8.8"])[0]["country_code"] == "US"  # Doesn't wait for the update check
+
+    done.set()
+    service._reload_thread.join()
+
+
+def test_download_while_serving(
+    locdb_path: Path, tmp_path: Path, mocker: MockerFixture, random_ips: Callable[..., list[str]]
+) -> None:
+    db_path = tmp_path / "location.db"
+    shutil.copy(locdb_path, db_path)
+    service = LookupService(db_path, offline=True, reload_interval=0)
+    service.lookup([])
+    service._reload_thread.join()
+
+    ips = random_ips(500)
+    expected = [(info.country_code, info.asn) for info in service._db.lookup_many(ips)]
+
+    service.offline = False  # From now on, check for updates: there is a new version to download
+    os.utime(db_path, (0, 0))
+    session = mocker.patch("location_ipfire_db_reader.download_db.Session").return_value
+    session.head.return_value = mocker.Mock(headers={"Last-Modified": "Wed, 15 Nov 2023 19:51:32 GMT"})
+    session.get.return_value = mocker.Mock(content=lzma.compress(_new_version(db_path), format=lzma.FORMAT_XZ))
+
+    with service._current_db() as old_db:
+        service.lookup([])  # Starts the download
+        service._reload_thread.join()
+        session.get.assert_called_once()
+
+        # Still in use: it keeps reading the version it was opened with
+        assert old_db is not service._db
+        assert [(info.country_code, info.asn) for info in old_db.lookup_many(ips)] == expected
+        assert service.lookup(["8.8.8.8"])[0]["country_code"] == "XX"
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["location.db"]  # No temporary files left behind
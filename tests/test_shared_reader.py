@@ -0,0 +1,103 @@
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from location_ipfire_db_reader import IPAddressError, LocationDatabase
+
+
+def test_open_shares_one_reader(locdb_path: Path) -> None:
+    db = LocationDatabase.open(locdb_path)
+    again = LocationDatabase.open(str(locdb_path.parent / ".." / "resources" / locdb_path.name))
+    other = LocationDatabase.open(locdb_path, raise_exceptions=False)
+    try:
+        assert db is again
+        assert db is not other
+        assert isinstance(db, LocationDatabase)
+        assert db.find_country("8.8.8.8") == "US"
+        assert again.fp is db.fp
+    finally:
+        db.close()
+        again.close()
+        other.close()
+
+
+def test_other_options_share_the_file(locdb_path: Path) -> None:
+    db = LocationDatabase.open(locdb_path)
+    with LocationDatabase.open(locdb_path, raise_exceptions=False) as other:
+        assert db.find_country("8.8.8.8") == other.find_country("8.8.8.8") == "US"
+        assert other.fp is db.fp
+        assert other.header is db.header
+        assert other._read_node is db._read_node
+        assert other._ipv4_jump_table is db._ipv4_jump_table
+        assert other.country_table._ipv4_starts is db.country_table._ipv4_starts
+
+        # Only the options differ.
+        with pytest.raises(IPAddressError):
+            db.country_table.find_country("10.0.0.1")
+        assert other.country_table.find_country("10.0.0.1") == ""
+        assert other["10.0.0.1"].country_code == ""
+
+        fp = db.fp
+        db.close()
+        assert not fp.closed  # `other` still uses it
+    assert fp.closed
+
+
+def test_open_takes_the_options_of_the_constructor(locdb_path: Path) -> None:
+    with pytest.raises(TypeError, match="Unknown options: colour"):
+        LocationDatabase.open(locdb_path, colour="blue")
+
+    with LocationDatabase.open(locdb_path, engine="multibit", multibit_stride=8) as db:
+        assert (db.engine, db.multibit_stride) == ("multibit", 8)
+        assert db.find_country("8.8.8.8") == "US"
+
+
+def test_close_when_the_last_user_is_done(locdb_path: Path) -> None:
+    first = LocationDatabase.open(locdb_path)
+    second = LocationDatabase.open(locdb_path)
+    fp = first.fp
+
+    first.close()
+    assert not fp.closed
+    assert second.find_country("8.8.8.8") == "US"
+
+    second.close()
+    assert fp.closed
+
+    with LocationDatabase.open(locdb_path) as fresh:
+        assert fresh is not first
+        assert fresh.find_country("8.8.8.8") == "US"
+        fp = fresh.fp
+    assert fp.closed
+
+
+def test_close_a_private_reader(locdb_path: Path) -> None:
+    with LocationDatabase(locdb_path) as db:
+        fp = db.fp
+        assert db["8.8.8.8"].country_code == "US"
+    assert fp.closed
+
+    db.close()  # Closing twice is fine
+
+
+def test_closed_reader_does_not_reopen(locdb_path: Path) -> None:
+    db = LocationDatabase(locdb_path)
+    db.close()
+    with pytest.raises(ValueError, match="closed"):
+        db.find_country("8.8.8.8")
+
+
+def test_threads_share_one_reader(
+    locdb_path: Path, locdb_noexc: LocationDatabase, random_ips: Callable[..., list[str]]
+) -> None:
+    ips = [*random_ips(4_000), "8.8.8.8", "1.1.1.1"]
+
+    def describe(db: LocationDatabase, ip: str) -> tuple:
+        info = db[ip]
+        return info.country_code, info.asn, info.asn_name if info.asn else ""
+
+    expected = [describe(locdb_noexc, ip) for ip in ips]
+    with LocationDatabase.open(locdb_path, raise_exceptions=False) as db, ThreadPoolExecutor(8) as pool:
+        assert list(pool.map(lambda ip: describe(db, ip), ips)) == expected
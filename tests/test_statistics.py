@@ -0,0 +1,77 @@
+import ipaddress
+import json
+import shutil
+from collections import defaultdict
+from pathlib import Path
+
+from location_ipfire_db_reader import LocationDatabase
+from location_ipfire_db_reader.interpret_location_db import loc_database_network_v1, size
+from location_ipfire_db_reader.network_record import _to_tree_address
+
+
+def _addresses_per_country(locdb: LocationDatabase, cidr: str) -> dict[str, int]:
+    """Every address counted for its most specific network, using query_network instead of the statistics."""
+    totals: dict[str, int] = defaultdict(int)
+    parents: list[tuple[ipaddress.IPv4Network, str]] = []
+
+    for record in locdb.query_network(cidr):
+        network = ipaddress.ip_network(record.network)
+        while parents and not network.subnet_of(parents[-1][0]):
+            parents.pop()
+        if parents:
+            totals[parents[-1][1]] -= network.num_addresses
+        totals[record.country_code] += network.num_addresses
+        parents.append((network, record.country_code))
+
+    return {country: total for country, total in totals.items() if total}
+
+
+def test_statistics(locdb: LocationDatabase) -> None:
+    stats = locdb.statistics()
+
+    assert stats["created_at"] == locdb.header.created_at
+    for family, max_prefix_length in (("ipv4", 32), ("ipv6", 128)):
+        assert len(stats[family]["prefix_lengths"]) == max_prefix_length + 1
+        assert sum(stats[family]["countries"].values()) == stats[family]["addresses"]
+        assert sum(stats[family]["asns"].values()) == stats[family]["addresses"]
+        for counts in stats[family]["flags"].values():
+            assert counts["addresses"] <= stats[family]["addresses"]
+
+    assert 0 < stats["ipv4"]["addresses"] < 2**32
+    assert stats["ipv4"]["countries"]["US"] >= 256
+    assert stats["ipv4"]["asns"][15169] >= 256
+    assert stats["ipv4"]["flags"]["anycast"]["networks"] >= 1
+
+    assert sum(stats["ipv4"]["prefix_lengths"]) == len(list(locdb.query_network("0.0.0.0/0")))
+    assert stats["ipv4"]["countries"] == _addresses_per_country(locdb, "0.0.0.0/0")
+
+
+def test_statistics_are_cached(locdb: LocationDatabase) -> None:
+    stats = locdb.statistics()
+    assert locdb.statistics() is stats
+
+
+def test_statistics_are_json_serializable(locdb: LocationDatabase) -> None:
+    stats = locdb.statistics()
+    decoded = json.loads(json.dumps(stats))
+
+    assert decoded["ipv4"]["prefix_lengths"] == stats["ipv4"]["prefix_lengths"]
+    assert decoded["ipv4"]["countries"] == stats["ipv4"]["countries"]
+    assert decoded["ipv4"]["asns"]["15169"] == stats["ipv4"]["asns"][15169]  # JSON keys are strings
+
+
+def test_statistics_per_file(locdb: LocationDatabase, tmp_path: Path) -> None:
+    """Another file with the same `created_at` in its header has its own statistics."""
+    other_path = tmp_path / "location.db"
+    shutil.copy(locdb.filename, other_path)
+    node_index, _ = locdb._descend_to_network(*_to_tree_address(ipaddress.ip_network("8.8.8.0/24")))
+    network_index = locdb._read_node(node_index).network
+    network_offset = locdb.header.network_data_offset + network_index * size(loc_database_network_v1)
+    with other_path.open("r+b") as fp:
+        fp.seek(network_offset)
+        fp.write(b"XX")
+
+    other = LocationDatabase(other_path, offline=True)
+    assert other.header.created_at == locdb.header.created_at
+    assert "XX" not in locdb.statistics()["ipv4"]["countries"]
+    assert other.statistics()["ipv4"]["countries"]["XX"] == 256
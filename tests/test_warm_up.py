@@ -0,0 +1,64 @@
+import os
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from location_ipfire_db_reader import LocationDatabase
+from location_ipfire_db_reader.database_reader import _convert_ip_to_bitstring
+
+
+def test_sections_are_within_the_file(locdb: LocationDatabase) -> None:
+    file_size = locdb.filename.stat().st_size
+    for offset, length in locdb.sections.values():
+        assert offset >= 0
+        assert offset + length <= file_size
+
+
+def test_warm_up_fills_the_ipv4_jump_table(locdb_path: Path) -> None:
+    warm = LocationDatabase(locdb_path)
+    warm.warm_up()
+    assert None not in warm._ipv4_jump_table
+
+    lazy = LocationDatabase(locdb_path)
+    for slot in range(0, 1 << 16, 97):
+        ip = f"{slot >> 8}.{slot & 0xFF}.0.1"
+        assert lazy._ipv4_jump(_convert_ip_to_bitstring(ip)) == warm._ipv4_jump_table[slot], ip
+
+
+def test_warm_up_builds_the_multibit_trie(locdb_path: Path) -> None:
+    db = LocationDatabase(locdb_path, engine="multibit")
+    db.warm_up()
+    assert "_multibit_trie" in db.__dict__
+
+
+def test_warm_up_gives_advice(locdb_path: Path, mocker: MockerFixture) -> None:
+    if not hasattr(os, "posix_fadvise"):
+        pytest.skip("posix_fadvise is not available on this platform")
+
+    db = LocationDatabase(locdb_path)
+    fadvise = mocker.patch("os.posix_fadvise")
+    db.warm_up(["network_tree"], cold=["pool", "as"])
+
+    fd = db.fp.fileno()
+    assert fadvise.call_args_list == [
+        mocker.call(fd, *db.sections["network_tree"], os.POSIX_FADV_WILLNEED),
+        mocker.call(fd, *db.sections["pool"], os.POSIX_FADV_DONTNEED),
+        mocker.call(fd, *db.sections["as"], os.POSIX_FADV_DONTNEED),
+    ]
+
+
+def test_warm_up_without_fadvise_reads_the_sections(locdb_path: Path, mocker: MockerFixture) -> None:
+    db = LocationDatabase(locdb_path)
+    mocker.patch.object(db, "_advise", return_value=False)  # As on platforms without posix_fadvise
+    read_section = mocker.spy(db, "_read_section")
+
+    db.warm_up(["countries"], cold=["pool"])
+
+    assert read_section.call_args_list == [mocker.call(*db.sections["countries"])]
+    assert db.find_country("8.8.8.8") == "US"
+
+
+def test_warm_up_unknown_section(locdb: LocationDatabase) -> None:
+    with pytest.raises(ValueError, match="Unknown sections: nodes"):
+        locdb.warm_up(["nodes"])